@@ -1,88 +1,82 @@
-from flask import Flask, render_template, request, jsonify
-import networkx as nx
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from flask import Flask, render_template, request, jsonify, g
 import io
-import base64
-import json
+import csv
+import uuid
+import os
+import tempfile
+import time
+import cProfile
+import charts
+import jobs
+import metrics
+import result_cache
+import scheduling
+import smp
+import sweep
+import traces
+import workloads
+from graph_store import GraphStore
+from resource_graph import process_node, resource_node
 
 app = Flask(__name__)
 
-class ResourceAllocationGraph:
-    def __init__(self):
-        self.processes = set()
-        self.resources = {}
-        self.allocation = {}
-        self.requests = {}
-        
-    def add_process(self, pid):
-        self.processes.add(pid)
-        
-    def add_resource(self, rid, instances):
-        self.resources[rid] = instances
-        
-    def allocate(self, pid, rid, instances):
-        if instances <= self.resources.get(rid, 0):
-            self.allocation[(pid, rid)] = instances
-            return True
-        return False
-        
-    def request(self, pid, rid, instances):
-        if instances <= self.resources.get(rid, 0):
-            self.requests[(pid, rid)] = instances
-            return True
-        return False
-        
-    def detect_deadlock(self):
-        G = nx.DiGraph()
-        
-        for p in self.processes:
-            G.add_node(f"P{p}", type="process")
-        for r in self.resources:
-            G.add_node(f"R{r}", type="resource")
-            
-        for (pid, rid), instances in self.allocation.items():
-            G.add_edge(f"R{rid}", f"P{pid}", weight=instances)
-            
-        for (pid, rid), instances in self.requests.items():
-            G.add_edge(f"P{pid}", f"R{rid}", weight=instances)
-            
+# One resource allocation graph per client session
+graphs = GraphStore()
+SESSION_COOKIE = 'rag_session'
+
+def current_session_id():
+    # API clients may pass X-Session-Id; browsers get a cookie
+    sid = request.headers.get('X-Session-Id') or request.cookies.get(SESSION_COOKIE)
+    if not sid or len(sid) > 64:
+        if 'new_session_id' not in g:
+            g.new_session_id = uuid.uuid4().hex
+        sid = g.new_session_id
+    return sid
+
+def session_graph():
+    return graphs.session(current_session_id())
+
+@app.after_request
+def set_session_cookie(response):
+    if 'new_session_id' in g:
+        response.set_cookie(SESSION_COOKIE, g.new_session_id, httponly=True, samesite='Lax')
+    return response
+
+# ?profile=1 dumps a cProfile of that request into PROFILE_DIR (pstats
+# format, path in the X-Profile header). Only honoured when PROFILE_REQUESTS
+# is set, which defaults to debug mode.
+PROFILE_DIR = 'profiles'
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if request.args.get('profile') and app.config.get('PROFILE_REQUESTS', app.debug):
+        profiler = cProfile.Profile()
         try:
-            cycles = list(nx.simple_cycles(G))
-            return len(cycles) > 0, cycles, self.get_graph_data(G)
-        except:
-            return False, [], self.get_graph_data(G)
-    
-    def get_graph_data(self, G):
-        nodes = []
-        edges = []
-        
-        for node in G.nodes():
-            node_type = "process" if node.startswith("P") else "resource"
-            nodes.append({
-                "id": node,
-                "label": node,
-                "type": node_type
-            })
-        
-        for (u, v) in G.edges():
-            edge_type = "allocation" if u.startswith("R") else "request"
-            edges.append({
-                "from": u,
-                "to": v,
-                "type": edge_type
-            })
-            
-        return {"nodes": nodes, "edges": edges}
-            
-    def clear(self):
-        self.processes.clear()
-        self.resources.clear()
-        self.allocation.clear()
-        self.requests.clear()
-
-# Global RAG instance
-rag = ResourceAllocationGraph()
+            profiler.enable()
+        except ValueError:
+            # Another thread's request is already being profiled
+            return
+        g.profiler = profiler
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    if 'request_start' in g:
+        metrics.HTTP_LATENCY.observe((route, request.method), time.perf_counter() - g.request_start)
+    metrics.HTTP_REQUESTS.inc((route, request.method, str(response.status_code)))
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof")
+        profiler.dump_stats(path)
+        response.headers['X-Profile'] = path
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    return app.response_class(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/')
 def index():
@@ -96,12 +90,327 @@ def scheduler():
 def rag_simulator():
     return render_template('rag.html')
 
+def parse_processes(items):
+    processes = []
+    for i, item in enumerate(items):
+        pid = item.get('pid', i + 1)
+        # Pids key schedules and stats, so they must be hashable and printable
+        if isinstance(pid, bool) or not isinstance(pid, (str, int)):
+            raise ValueError("Invalid process data")
+        processes.append({
+            'pid': pid,
+            'arrival': int(item.get('arrival', 0)),
+            'burst': int(item['burst']),
+            'priority': int(item.get('priority') or 0)
+        })
+        if processes[-1]['arrival'] < 0 or processes[-1]['burst'] < 1:
+            raise ValueError("Arrival must be non-negative and burst positive")
+    return processes
+
+# Each simulation endpoint has an *_args function that validates its body,
+# raising ValueError with the message for the client (sent with a 400), and
+# a *_result function that runs it; /api/jobs runs the same pairs in the
+# background.
+
+DEFAULT_QUANTUM = 2
+
+def parse_quantum(value):
+    # Only a missing quantum gets the default: 0 is rejected, not replaced
+    if value in (None, ''):
+        return DEFAULT_QUANTUM
+    try:
+        quantum = int(value)
+    except (TypeError, ValueError):
+        quantum = 0
+    if quantum < 1:
+        raise ValueError("Quantum must be a positive integer")
+    return quantum
+
+def schedule_args(data):
+    algo = scheduling.ALIASES.get(data.get('algorithm'), data.get('algorithm'))
+    if algo not in scheduling.ALGORITHMS:
+        raise ValueError("Unknown scheduling algorithm")
+    try:
+        processes = parse_processes(data.get('processes') or [])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError("Invalid process data") from None
+    return algo, processes, parse_quantum(data.get('quantum'))
+
+def schedule_result(algo, processes, quantum, progress=None):
+    schedule, stats = result_cache.run_algorithm(algo, processes, quantum, progress=progress)
+    return {
+        "status": "success",
+        "algorithm": algo,
+        "schedule": schedule.to_json(),
+        "stats": stats
+    }
+
+@app.route('/api/schedule', methods=['POST'])
+def run_schedule():
+    try:
+        args = schedule_args(request.json or {})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(schedule_result(*args))
+
+# Rendered charts are cached by a hash of everything that determines the
+# image, so a repeated request skips both scheduling and drawing
+images = charts.ImageCache()
+
+def image_response(image, fmt, etag):
+    # image None answers a matching If-None-Match with 304
+    if image is None:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(image, mimetype=charts.FORMATS[fmt])
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def image_options(data):
+    fmt = str(data.get('format') or 'png').lower()
+    if fmt not in charts.FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(charts.FORMATS)}")
+    size = []
+    for key in ('width', 'height'):
+        value = data.get(key)
+        try:
+            value = None if value in (None, '') else int(value)
+        except (TypeError, ValueError):
+            value = 0
+        if value is not None and value < 1:
+            raise ValueError("Width and height must be positive integers")
+        size.append(value)
+    return fmt, charts.image_size(*size)
+
+@app.route('/api/schedule/image', methods=['POST'])
+def schedule_image():
+    # Same body as /api/schedule plus optional format (png or svg), width
+    # and height in pixels; returns the Gantt chart as one image
+    data = request.json or {}
+    try:
+        algo, processes, quantum = schedule_args(data)
+        fmt, size = image_options(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    key = charts.workload_key('gantt', algo, quantum, processes, fmt, size)
+    if key in request.if_none_match:
+        return image_response(None, fmt, key)
+
+    def render():
+        schedule, _ = result_cache.run_algorithm(algo, processes, quantum)
+        return charts.gantt_image(schedule, fmt, size, title=f"Gantt Chart ({algo})")
+
+    return image_response(images.get(key, 'gantt', render), fmt, key)
+
+def sweep_args(data):
+    objective = data.get('objective', 'avg_wt')
+    if objective not in sweep.OBJECTIVES:
+        raise ValueError("Unknown objective")
+    try:
+        processes = parse_processes(data.get('processes') or [])
+        quanta = [int(q) for q in data.get('quanta') or sweep.DEFAULT_QUANTA]
+        workers = int(data['jobs']) if data.get('jobs') else None
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError("Invalid sweep data") from None
+    if not processes:
+        raise ValueError("No processes to schedule")
+    return processes, quanta, objective, workers
+
+def sweep_result(processes, quanta, objective, workers, progress=None):
+    results = sweep.sweep(processes, quanta=quanta, objective=objective, jobs=workers, progress=progress)
+    return {
+        "status": "success",
+        "objective": objective,
+        "best": results[0],
+        "results": results
+    }
+
+@app.route('/api/sweep', methods=['POST'])
+def run_sweep():
+    try:
+        args = sweep_args(request.json or {})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(sweep_result(*args))
+
+MAX_CORES = 1024
+
+def smp_args(data):
+    algo = scheduling.ALIASES.get(data.get('algorithm'), data.get('algorithm'))
+    if algo not in smp.POLICIES:
+        raise ValueError("Unknown scheduling algorithm")
+    balancer = data.get('balancer', 'steal')
+    if balancer not in smp.BALANCERS:
+        raise ValueError("Unknown load balancer")
+    try:
+        processes = parse_processes(data.get('processes') or [])
+        cores = int(data.get('cores') or 4)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ValueError("Invalid process data") from None
+    if not 1 <= cores <= MAX_CORES:
+        raise ValueError(f"Cores must be between 1 and {MAX_CORES}")
+    return algo, processes, cores, balancer, parse_quantum(data.get('quantum'))
+
+def smp_result(algo, processes, cores, balancer, quantum, progress=None):
+    schedules, stats = smp.simulate(algo, processes, cores=cores, balancer=balancer, quantum=quantum,
+                                    progress=progress)
+    return {
+        "status": "success",
+        "algorithm": algo,
+        "schedules": [schedule.to_json() for schedule in schedules],
+        "stats": stats
+    }
+
+@app.route('/api/smp', methods=['POST'])
+def run_smp():
+    try:
+        args = smp_args(request.json or {})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(smp_result(*args))
+
+MAX_WORKLOAD_JSON = 100_000  # generated processes returned as JSON objects
+MAX_WORKLOAD_DOWNLOAD = 10_000_000  # generated processes returned as a CSV or trace file
+WORKLOAD_FORMATS = {'json': None, 'csv': 'text/csv', 'trace': 'application/octet-stream'}
+
+def workload_args(data):
+    # Generator settings as for python -m workloads. With an algorithm the
+    # workload is scheduled server-side and only stats come back, which
+    # works up to workloads.MAX_PROCESSES; otherwise the processes are
+    # returned in the requested format.
+    algo = data.get('algorithm')
+    if algo is not None:
+        algo = scheduling.ALIASES.get(algo, algo)
+        if algo not in scheduling.ALGORITHMS:
+            raise ValueError("Unknown scheduling algorithm")
+    fmt = str(data.get('format') or 'json').lower()
+    if fmt not in WORKLOAD_FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(WORKLOAD_FORMATS)}")
+    try:
+        n = int(data.get('processes', 100))
+        load = float(data.get('load', 0.9))
+        mean_burst = int(data.get('mean_burst', 10))
+        seed = int(data.get('seed', 0))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid workload settings") from None
+    arrival = data.get('arrival', 'poisson')
+    burst = data.get('burst', 'exponential')
+    priority = data.get('priority', 'uniform')
+    if arrival not in workloads.ARRIVALS or burst not in workloads.BURSTS or priority not in workloads.PRIORITY_MIXES:
+        raise ValueError(f"Arrival must be one of {', '.join(workloads.ARRIVALS)}, burst one of "
+                         f"{', '.join(workloads.BURSTS)} and priority one of {', '.join(workloads.PRIORITY_MIXES)}")
+    limit = workloads.MAX_PROCESSES if algo else MAX_WORKLOAD_JSON if fmt == 'json' else MAX_WORKLOAD_DOWNLOAD
+    if not 0 <= n <= limit:
+        raise ValueError(f"Processes must be between 0 and {limit}")
+    if load <= 0 or mean_burst < 1:
+        raise ValueError("Load and mean burst must be positive")
+    return (n, arrival, burst, priority, load, mean_burst, seed), algo, parse_quantum(data.get('quantum')), fmt
+
+def workload_result(settings, algo, quantum, fmt, progress=None):
+    if algo is None and settings[0] > MAX_WORKLOAD_JSON:
+        raise ValueError(f"At most {MAX_WORKLOAD_JSON} processes can be returned as JSON")
+    table = workloads.generate(*settings)
+    if algo is None:
+        return {"status": "success", "processes": table.to_dicts()}
+    _, stats = result_cache.run_algorithm(algo, table, quantum, keep_schedule=False, progress=progress)
+    return {"status": "success", "algorithm": algo, "processes": len(table), "stats": stats}
+
+@app.route('/api/workload', methods=['POST'])
+def generate_workload():
+    try:
+        settings, algo, quantum, fmt = workload_args(request.json or {})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if algo is not None or fmt == 'json':
+        return jsonify(workload_result(settings, algo, quantum, fmt))
+    table = workloads.generate(*settings)
+    if fmt == 'csv':
+        f = io.StringIO()
+        workloads.write_csv(f, table)
+        body = f.getvalue()
+    else:
+        body = traces.trace_bytes(table)
+    response = app.response_class(body, mimetype=WORKLOAD_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=workload.{fmt}'
+    return response
+
+# Background runs: POST {"type": "schedule" | "sweep" | "smp" | "workload", ...}
+# with the rest of the body as for that endpoint returns a job to poll with
+# GET /api/jobs/<id> (the result is included once done) and cancel with DELETE
+JOB_TYPES = {
+    'schedule': (schedule_args, schedule_result),
+    'sweep': (sweep_args, sweep_result),
+    'smp': (smp_args, smp_result),
+    'workload': (workload_args, workload_result),
+}
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    data = request.json or {}
+    kind = data.get('type')
+    if kind not in JOB_TYPES:
+        return jsonify({"status": "error", "message": "Unknown job type"}), 400
+    parse, run = JOB_TYPES[kind]
+    try:
+        args = parse(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        job = jobs.manager.submit(lambda job: run(*args, progress=job.report), kind=kind)
+    except jobs.JobLimitError as e:
+        return jsonify({"status": "error", "message": str(e)})
+    return jsonify({"status": "success", "job": job.snapshot()})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def poll_job(job_id):
+    job = jobs.manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job"})
+    result = {"status": "success", "job": job.snapshot()}
+    if job.status == jobs.DONE:
+        result["result"] = job.result
+    return jsonify(result)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = jobs.manager.cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job"})
+    return jsonify({"status": "success", "job": job.snapshot()})
+
+@app.route('/api/trace', methods=['POST'])
+def replay_trace():
+    # Multipart upload of a CSV or binary trace; only stats come back since
+    # the schedule of a large trace is too big to send
+    upload = request.files.get('file')
+    algo = scheduling.ALIASES.get(request.form.get('algorithm'), request.form.get('algorithm'))
+    if upload is None:
+        return jsonify({"status": "error", "message": "No trace file uploaded"}), 400
+    if algo not in scheduling.ALGORITHMS:
+        return jsonify({"status": "error", "message": "Unknown scheduling algorithm"}), 400
+    try:
+        quantum = parse_quantum(request.form.get('quantum'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    fd, path = tempfile.mkstemp(suffix='.trace')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            upload.save(f)
+        stats = traces.replay(path, algo, quantum)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e).replace(path, upload.filename or 'trace')}), 400
+    finally:
+        os.remove(path)
+    return jsonify({"status": "success", "algorithm": algo, "stats": stats})
+
 @app.route('/api/process', methods=['POST'])
 def add_process():
     data = request.json
     pid = data.get('pid')
     if pid:
-        rag.add_process(int(pid))
+        with session_graph() as rag:
+            rag.add_process(int(pid))
         return jsonify({"status": "success"})
     return jsonify({"status": "error", "message": "Invalid process ID"})
 
@@ -111,7 +420,8 @@ def add_resource():
     rid = data.get('rid')
     instances = data.get('instances')
     if rid and instances:
-        rag.add_resource(rid, int(instances))
+        with session_graph() as rag:
+            rag.add_resource(rid, int(instances))
         return jsonify({"status": "success"})
     return jsonify({"status": "error", "message": "Invalid resource data"})
 
@@ -122,8 +432,10 @@ def allocate_resource():
     rid = data.get('rid')
     instances = data.get('instances')
     if pid and rid and instances:
-        success = rag.allocate(int(pid), rid, int(instances))
-        return jsonify({"status": "success" if success else "error"})
+        with session_graph() as rag:
+            success = rag.allocate(int(pid), rid, int(instances))
+            closes_cycle = rag.closes_cycle(resource_node(rid), process_node(int(pid)))
+        return jsonify({"status": "success" if success else "error", "closes_cycle": closes_cycle})
     return jsonify({"status": "error", "message": "Invalid allocation data"})
 
 @app.route('/api/request', methods=['POST'])
@@ -133,23 +445,210 @@ def request_resource():
     rid = data.get('rid')
     instances = data.get('instances')
     if pid and rid and instances:
-        success = rag.request(int(pid), rid, int(instances))
-        return jsonify({"status": "success" if success else "error"})
+        with session_graph() as rag:
+            success = rag.request(int(pid), rid, int(instances))
+            closes_cycle = rag.closes_cycle(process_node(int(pid)), resource_node(rid))
+        return jsonify({"status": "success" if success else "error", "closes_cycle": closes_cycle})
     return jsonify({"status": "error", "message": "Invalid request data"})
 
+@app.route('/api/release', methods=['POST'])
+def release_resource():
+    # instances may be left out to release everything pid holds of rid
+    data = request.json or {}
+    pid = data.get('pid')
+    rid = data.get('rid')
+    instances = data.get('instances')
+    if pid and rid:
+        with session_graph() as rag:
+            success = rag.release(int(pid), rid, None if instances in (None, '') else int(instances))
+            has_deadlock = rag.has_deadlock()
+        return jsonify({"status": "success" if success else "error", "has_deadlock": has_deadlock})
+    return jsonify({"status": "error", "message": "Invalid release data"})
+
+@app.route('/api/max_claim', methods=['POST'])
+def set_max_claim():
+    data = request.json
+    pid = data.get('pid')
+    rid = data.get('rid')
+    instances = data.get('instances')
+    if pid and rid and instances is not None:
+        with session_graph() as rag:
+            success = rag.set_max_claim(int(pid), rid, int(instances))
+        return jsonify({"status": "success" if success else "error"})
+    return jsonify({"status": "error", "message": "Invalid claim data"})
+
+@app.route('/api/can_grant', methods=['POST'])
+def can_grant():
+    # Banker's avoidance check; with "grant": true the request is also
+    # allocated when it keeps the system safe
+    data = request.json
+    pid = data.get('pid')
+    rid = data.get('rid')
+    instances = data.get('instances')
+    if pid and rid and instances:
+        with session_graph() as rag:
+            if data.get('grant'):
+                granted = rag.grant(int(pid), rid, int(instances))
+                return jsonify({"status": "success", "can_grant": granted, "granted": granted})
+            allowed = rag.can_grant(int(pid), rid, int(instances))
+        return jsonify({"status": "success", "can_grant": allowed, "granted": False})
+    return jsonify({"status": "error", "message": "Invalid grant data"})
+
+MAX_BATCH_OPERATIONS = 100_000
+BATCH_FIELDS = {
+    'process': ('pid',),
+    'resource': ('rid', 'instances'),
+    'allocate': ('pid', 'rid', 'instances'),
+    'request': ('pid', 'rid', 'instances'),
+    'release': ('pid', 'rid', 'instances'),
+    'max_claim': ('pid', 'rid', 'instances'),
+}
+
+def parse_operation(item):
+    name = item.get('op')
+    if name not in BATCH_FIELDS:
+        raise ValueError(f"Unknown operation: {name}")
+    args = []
+    for field in BATCH_FIELDS[name]:
+        value = item.get(field)
+        if value in (None, ''):
+            raise ValueError(f"Missing {field}")
+        args.append(value if field == 'rid' else int(value))
+    # A zero or negative count would land in the Allocation/Request matrices
+    if name in ('allocate', 'request') and args[-1] < 1:
+        raise ValueError(f"{name} instances must be positive")
+    return name, tuple(args)
+
+@app.route('/api/batch', methods=['POST'])
+def apply_batch():
+    # Accepts {"operations": [{"op": ..., "pid": ..., "rid": ..., "instances": ...}],
+    # "detect": bool} or a CSV upload (field "file", header op,pid,rid,instances)
+    if 'file' in request.files:
+        stream = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8')
+        items = list(csv.DictReader(stream))
+        detect = request.form.get('detect', '').lower() in ('1', 'true', 'yes')
+    else:
+        data = request.json or {}
+        items = data.get('operations') or []
+        detect = bool(data.get('detect'))
+    if len(items) > MAX_BATCH_OPERATIONS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_OPERATIONS} operations per batch"})
+
+    operations = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            operations.append(parse_operation(item))
+        except (TypeError, ValueError, AttributeError) as exc:
+            errors.append({"index": index, "message": str(exc)})
+    if errors:
+        return jsonify({"status": "error", "applied": 0, "errors": errors}), 400
+
+    with session_graph() as rag:
+        errors = rag.apply_batch(operations)
+        if errors:
+            return jsonify({"status": "error", "applied": 0, "errors": errors})
+        result = {"status": "success", "applied": len(operations), "errors": []}
+        if detect:
+            has_deadlock, _ = rag.detect_deadlock()
+            result.update({
+                "has_deadlock": has_deadlock,
+                "deadlocked": sorted(rag.deadlocked_nodes()),
+                "deadlocked_processes": rag.deadlocked_processes()
+            })
+    return jsonify(result)
+
+# Cycle listing is opt-in via ?max_cycles=K and always capped so the
+# endpoint has bounded latency at any graph size
+MAX_CYCLES_LIMIT = 1000
+CYCLE_TIME_BUDGET = 0.25
+
 @app.route('/api/detect_deadlock', methods=['GET'])
 def detect_deadlock():
-    has_deadlock, cycles, graph_data = rag.detect_deadlock()
-    return jsonify({
+    try:
+        max_cycles = max(min(int(request.args.get('max_cycles', 0)), MAX_CYCLES_LIMIT), 0)
+        time_budget = min(float(request.args.get('time_budget_ms', CYCLE_TIME_BUDGET * 1000)) / 1000, CYCLE_TIME_BUDGET)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid cycle limits"})
+    with session_graph() as rag:
+        # The ETag names the graph, its version and the query, so polling
+        # clients get a 304 until something actually changes
+        etag = f"{rag.uid}-{rag.version}-{max_cycles}-{time_budget}"
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            body = rag.cached(('detect_response', max_cycles, time_budget),
+                              lambda: app.json.dumps(deadlock_report(rag, max_cycles, time_budget)))
+            response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def deadlock_report(rag, max_cycles, time_budget):
+    has_deadlock, cycles = rag.detect_deadlock(max_cycles, time_budget)
+    return {
         "has_deadlock": has_deadlock,
+        "deadlocked": sorted(rag.deadlocked_nodes()),
+        "deadlocked_processes": rag.deadlocked_processes(),
         "cycles": cycles,
-        "graph_data": graph_data
-    })
+        "graph_data": rag.get_graph_data()
+    }
+
+# Time travel over the session's event log: ?event=N reports detection as
+# it stood after the first N accepted operations (default: all of them)
+@app.route('/api/history', methods=['GET'])
+def history_report():
+    try:
+        event = request.args.get('event')
+        event = None if event in (None, '') else int(event)
+        max_cycles = max(min(int(request.args.get('max_cycles', 0)), MAX_CYCLES_LIMIT), 0)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid event or cycle limit"})
+    with session_graph() as rag:
+        log = rag.history
+        if event is None:
+            event = len(log)
+        try:
+            past = log.state_at(event)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)})
+        result = {"status": "success", "event": event, "events": len(log), "checkpoints": len(log.offsets)}
+    result.update(deadlock_report(past, max_cycles, CYCLE_TIME_BUDGET))
+    return jsonify(result)
+
+@app.route('/api/history/first_deadlock', methods=['GET'])
+def first_deadlock():
+    # ?multi_instance=1 asks for a deadlock that spare instances cannot
+    # resolve rather than any cycle; see EventLog.first_deadlock
+    multi_instance = request.args.get('multi_instance', '').lower() in ('1', 'true', 'yes')
+    with session_graph() as rag:
+        log = rag.history
+        event = log.first_deadlock(multi_instance)
+        operation = None
+        if event is not None:
+            name, args = log.events[event - 1]
+            operation = {"op": name, "args": list(args)}
+    return jsonify({"status": "success", "event": event, "operation": operation, "events": len(log)})
+
+@app.route('/api/rag/image', methods=['GET'])
+def rag_image():
+    # The session's graph as one image; ?format=png|svg&width=&height=
+    try:
+        fmt, size = image_options(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    with session_graph() as rag:
+        etag = f"{rag.uid}-{rag.version}-{fmt}-{size[0]}x{size[1]}"
+        if etag in request.if_none_match:
+            return image_response(None, fmt, etag)
+        image = images.get(('rag', etag), 'rag', lambda: charts.rag_image(rag, fmt, size))
+    return image_response(image, fmt, etag)
 
 @app.route('/api/reset', methods=['POST'])
 def reset_rag():
-    rag.clear()
+    with session_graph() as rag:
+        rag.clear()
     return jsonify({"status": "success"})
 
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    app.run(debug=True, threaded=True) 
\ No newline at end of file
@@ -0,0 +1,222 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import scheduling
+import workloads
+from resource_graph import ResourceAllocationGraph
+
+# Benchmarks for the scheduling algorithms and deadlock detection.
+#
+#   python benchmark.py --output results.json
+#   python benchmark.py --baseline results.json --threshold 0.2
+#
+# Each case is run --repeat times and the fastest wall time is kept; peak
+# memory comes from a separate tracemalloc run so tracing does not slow the
+# timed runs. With --baseline, a case regresses when its wall time or peak
+# memory exceeds the baseline's by more than the threshold, and the exit
+# status is 1.
+
+WORKLOAD_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+RAG_SIZES = (100, 1_000, 10_000)
+RAG_DENSITIES = (1, 4)  # requests per process
+DEFAULT_THRESHOLD = 0.2
+CYCLE_LIMIT = 10  # cycles listed by the rag-cycles cases
+CYCLE_BUDGET = 1.0
+
+
+# Distribution name: (arrival process, burst distribution) for workloads.generate
+DISTRIBUTIONS = {
+    'poisson-exponential': ('poisson', 'exponential'),
+    'poisson-pareto': ('poisson', 'pareto'),
+    'batch-uniform': ('batch', 'uniform'),
+}
+
+
+def make_workload(n, distribution, seed=0):
+    arrival, burst = DISTRIBUTIONS[distribution]
+    return workloads.generate(n, arrival, burst, seed=seed)
+
+
+def make_rag_operations(processes, density, seed=0):
+    # Each process holds one single-instance resource and requests density
+    # others, so larger densities mean more cycles
+    rng = np.random.default_rng(seed)
+    resources = max(processes // 2, 1)
+    ops = [('resource', rid, 1) for rid in range(resources)]
+    ops += [('process', pid) for pid in range(processes)]
+    holders = rng.permutation(processes)[:resources]
+    ops += [('allocate', int(pid), rid, 1) for rid, pid in enumerate(holders)]
+    for pid in range(processes):
+        for rid in rng.choice(resources, size=min(density, resources), replace=False).tolist():
+            ops.append(('request', pid, rid, 1))
+    return ops
+
+
+def make_rag_chain(processes):
+    # Process i holds resource i and requests resource i + 1, and the last
+    # one requests resource 0: a single cycle through every node, built one
+    # link at a time, which is the worst case for the incremental order
+    ops = [('resource', rid, 1) for rid in range(processes)]
+    ops += [('allocate', pid, pid, 1) for pid in range(processes)]
+    ops += [('request', pid, (pid + 1) % processes, 1) for pid in range(processes)]
+    return ops
+
+
+def build_rag(ops):
+    rag = ResourceAllocationGraph()
+    for op, *args in ops:
+        if op == 'resource':
+            rag.add_resource(*args)
+        elif op == 'process':
+            rag.add_process(*args)
+        elif op == 'allocate':
+            rag.allocate(*args)
+        else:
+            rag.request(*args)
+    return rag
+
+
+def detect(rag):
+    # Drop the per-version cache so detection actually runs: collecting
+    # the cyclic components behind deadlocked_nodes and the matrix detector
+    rag.cache.clear()
+    return rag.detect_deadlock(), rag.deadlocked_nodes(), rag.deadlocked_processes()
+
+
+def list_cycles(rag):
+    rag.cache.clear()
+    return rag.detect_deadlock(CYCLE_LIMIT, CYCLE_BUDGET)
+
+
+def measure(fn, repeat, memory=True):
+    wall = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        wall = min(wall, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return wall, peak
+
+
+def run_benchmarks(sizes=WORKLOAD_SIZES, algorithms=None, distributions=None, rag_sizes=RAG_SIZES,
+                   rag_densities=RAG_DENSITIES, quantum=4, repeat=3, memory=True, seed=0, log=None):
+    algorithms = [scheduling.ALIASES.get(a, a) for a in algorithms or scheduling.ALGORITHMS]
+    results = []
+
+    def record(name, ops, fn):
+        wall, peak = measure(fn, repeat, memory)
+        result = {'name': name, 'ops': ops, 'wall_time': wall, 'peak_memory': peak,
+                  'ops_per_sec': ops / wall if wall else 0}
+        results.append(result)
+        if log:
+            log(result)
+
+    for distribution in distributions or DISTRIBUTIONS:
+        for n in sizes:
+            table = make_workload(n, distribution, seed)
+            for algo in algorithms:
+                record(f"{algo}/{distribution}/{n}", n,
+                       lambda: scheduling.run_algorithm(algo, table, quantum))
+
+    for n in rag_sizes:
+        for density in rag_densities:
+            ops = make_rag_operations(n, density, seed)
+            record(f"rag-build/{n}/{density}", len(ops), lambda: build_rag(ops))
+            rag = build_rag(ops)
+            record(f"rag-detect/{n}/{density}", rag.size(), lambda: detect(rag))
+            record(f"rag-cycles/{n}/{density}", rag.size(), lambda: list_cycles(rag))
+        # As many resources as the cases above; the build includes the one
+        # rebuild it defers
+        ops = make_rag_chain(max(n // 2, 1))
+        record(f"rag-chain-build/{n}", len(ops), lambda: build_rag(ops).has_deadlock())
+        rag = build_rag(ops)
+        record(f"rag-chain-detect/{n}", rag.size(), lambda: detect(rag))
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Returns (name, metric, baseline value, new value) for every regression
+    previous = {r['name']: r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None:
+            continue
+        for metric in ('wall_time', 'peak_memory'):
+            if old.get(metric) and result.get(metric) and result[metric] > old[metric] * (1 + threshold):
+                regressions.append((result['name'], metric, old[metric], result[metric]))
+    return regressions
+
+
+def _print_result(result):
+    memory = f"{result['peak_memory'] / 2**20:9.1f} MiB" if result['peak_memory'] is not None else ''
+    print(f"{result['name']:<60} {result['wall_time']:10.4f}s {result['ops_per_sec']:14.0f} ops/s {memory}",
+          flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schedulers and deadlock detection")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(WORKLOAD_SIZES))
+    parser.add_argument('--algorithms', nargs='+', help="names or aliases (default: all)")
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS))
+    parser.add_argument('--rag-sizes', type=int, nargs='*', default=list(RAG_SIZES))
+    parser.add_argument('--rag-densities', type=int, nargs='+', default=list(RAG_DENSITIES))
+    parser.add_argument('--quantum', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default 0.2)")
+    args = parser.parse_args(argv)
+
+    unknown = [a for a in args.algorithms or [] if scheduling.ALIASES.get(a, a) not in scheduling.ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithms: {', '.join(unknown)}")
+
+    results = run_benchmarks(
+        sizes=args.sizes, algorithms=args.algorithms, distributions=args.distributions,
+        rag_sizes=args.rag_sizes, rag_densities=args.rag_densities, quantum=args.quantum,
+        repeat=max(args.repeat, 1), memory=not args.no_memory, seed=args.seed, log=_print_result,
+    )
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': args.seed,
+            'quantum': args.quantum,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old:.4g} -> {new:.4g} ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import gantt
+import metrics
+
+# Server-side Gantt and resource allocation graph images, drawn with the
+# headless Agg backend (SVG through matplotlib's SVG writer). Gantt charts go
+# through gantt.GanttRenderer, so an image of millions of slices costs about
+# as much as one of a few hundred. Rendered images are kept in a byte-bounded
+# LRU cache keyed by a hash of the workload or by the graph's uid and version.
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+DEFAULT_SIZE = (1200, 300)
+MIN_SIZE = 100
+MAX_SIZE = 4000
+DPI = 100
+PALETTE = ['#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6',
+           '#EC4899', '#06B6D4', '#F97316', '#6366F1', '#14B8A6']
+RAG_LABEL_LIMIT = 100  # nodes are labelled when the graph has at most this many
+RAG_ARROW_LIMIT = 2000  # larger graphs draw edges as plain segments, which is much faster
+ARROW_SHORTEN = 0.03  # fraction of each edge left uncovered so arrowheads clear the node markers
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 2**20
+
+
+class ImageCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key: image bytes, least recently used first
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, kind, render):
+        # Returns the cached image for key, rendering it on a miss. Two
+        # requests missing at once both render; the second store wins.
+        with self.lock:
+            image = self.entries.get(key)
+            if image is not None:
+                self.entries.move_to_end(key)
+        metrics.IMAGE_CACHE.inc((kind, 'miss' if image is None else 'hit'))
+        if image is not None:
+            return image
+        image = render()
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            if len(image) <= self.max_bytes:
+                self.entries[key] = image
+                self.total_bytes += len(image)
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return image
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def image_size(width, height):
+    # Clamped pixel size; None falls back to the default
+    width = DEFAULT_SIZE[0] if width is None else width
+    height = DEFAULT_SIZE[1] if height is None else height
+    return min(max(int(width), MIN_SIZE), MAX_SIZE), min(max(int(height), MIN_SIZE), MAX_SIZE)
+
+
+def workload_key(*parts):
+    # Hash of a JSON-serializable description of what is being drawn
+    text = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _figure(size):
+    fig = Figure(figsize=(size[0] / DPI, size[1] / DPI), dpi=DPI)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _encode(fig, fmt):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=DPI)
+    return buf.getvalue()
+
+
+def gantt_image(schedule, fmt='png', size=DEFAULT_SIZE, title="Gantt Chart"):
+    fig = _figure(size)
+    ax = fig.add_subplot()
+    renderer = gantt.GanttRenderer(ax, schedule, PALETTE, y=0.1, height=0.8)
+    ax.set_ylim(0, 1)
+    ax.set_yticks([])
+    ax.set_xlabel("Time")
+    ax.set_title(title)
+    ax.grid(True, axis='x', linestyle='--', alpha=0.3)
+    fig.tight_layout()
+    # Setting the limits after the layout renders the bars for the final
+    # axes width
+    ax.set_xlim(0, max(schedule.makespan, 1))
+    renderer.disconnect()
+    return _encode(fig, fmt)
+
+
+def rag_image(rag, fmt='png', size=DEFAULT_SIZE):
+    # Processes in the left column, resources in the right; requests and
+    # allocations are drawn as one collection each, deadlocked nodes in red
+    fig = _figure(size)
+    ax = fig.add_subplot()
+    ax.set_axis_off()
+    ax.set_title("Resource Allocation Graph")
+    columns = {'process': [], 'resource': []}
+    for node, node_type in rag.graph.nodes(data='type'):
+        columns[node_type].append(node)
+    pos = {}
+    for x, nodes in ((-1, columns['process']), (1, columns['resource'])):
+        for i, node in enumerate(nodes):
+            pos[node] = (x, -i)
+    if not pos:
+        return _encode(fig, fmt)
+
+    deadlocked = rag.deadlocked_nodes()
+    for kind, marker, color in (('process', 'o', PALETTE[0]), ('resource', 's', PALETTE[1])):
+        nodes = columns[kind]
+        if nodes:
+            xy = np.array([pos[n] for n in nodes], dtype=float)
+            ax.scatter(xy[:, 0], xy[:, 1], marker=marker, s=200, zorder=2,
+                       c=[PALETTE[3] if n in deadlocked else color for n in nodes])
+    for kind, color in (('resource', PALETTE[1]), ('process', PALETTE[2])):
+        # Allocation edges start at a resource, request edges at a process
+        edges = [(pos[u], pos[v]) for u, v in rag.graph.edges() if rag.graph.nodes[u]['type'] == kind]
+        if len(edges) > RAG_ARROW_LIMIT:
+            ax.add_collection(LineCollection(edges, colors=color, linewidths=0.5, zorder=1))
+        elif edges:
+            xy = np.array(edges, dtype=float)
+            delta = (xy[:, 1] - xy[:, 0]) * (1 - 2 * ARROW_SHORTEN)
+            tail = xy[:, 0] + (xy[:, 1] - xy[:, 0]) * ARROW_SHORTEN
+            ax.quiver(tail[:, 0], tail[:, 1], delta[:, 0], delta[:, 1], angles='xy', scale_units='xy', scale=1,
+                      color=color, width=0.002, headwidth=5, headlength=7, zorder=1)
+    if len(pos) <= RAG_LABEL_LIMIT:
+        for node, (x, y) in pos.items():
+            ax.annotate(node, (x, y), xytext=(-12 if x < 0 else 12, 0), textcoords='offset points',
+                        ha='right' if x < 0 else 'left', va='center')
+    ax.set_xlim(-1.5, 1.5)
+    rows = max(len(columns['process']), len(columns['resource']))
+    ax.set_ylim(-rows, 1)
+    return _encode(fig, fmt)
@@ -0,0 +1,117 @@
+from math import inf
+
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import Patch
+from matplotlib.ticker import MaxNLocator
+
+# Level-of-detail Gantt renderer for a single-CPU Schedule. All bars live in
+# one PolyCollection that is rebuilt for the visible time range whenever the
+# axes are zoomed, panned or resized. When more slices are visible than
+# the axes are pixels wide, each pixel column is drawn in the color of the
+# slice under its center and equal neighbours are merged, so the work per
+# redraw is bounded by the axes width rather than the schedule length.
+
+LABEL_LIMIT = 40  # label bars with their pid when at most this many are drawn
+MIN_LABEL_PIXELS = 24
+
+
+class GanttRenderer:
+    def __init__(self, ax, schedule, palette, edgecolor='black', y=0.5, height=0.5):
+        self.ax = ax
+        self.start = schedule.start
+        self.end = schedule.end
+        self.proc = schedule.proc
+        # One color and label per distinct proc code
+        self.codes, inverse = np.unique(self.proc, return_inverse=True)
+        self.color_index = inverse.reshape(-1)
+        self.palette = list(palette)
+        self.rgba = to_rgba_array(self.palette)
+        pids = schedule.pids
+        self.names = [f"P{pids[code] if pids is not None else code}" for code in self.codes.tolist()]
+        self.edgecolor = edgecolor
+        self.y = y
+        self.height = height
+        self.reveal = inf
+        self.texts = []
+        self.collection = PolyCollection([], edgecolors=edgecolor)
+        ax.add_collection(self.collection)
+        ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        self.callbacks = [
+            ('ax', ax.callbacks.connect('xlim_changed', lambda _: self.render())),
+            ('canvas', ax.figure.canvas.mpl_connect('resize_event', lambda _: self.render())),
+        ]
+
+    def color(self, i):
+        return self.palette[i % len(self.palette)]
+
+    def legend_handles(self, limit=20):
+        return [Patch(color=self.color(i), label=name) for i, name in enumerate(self.names[:limit])]
+
+    def disconnect(self):
+        for owner, cid in self.callbacks:
+            if owner == 'ax':
+                self.ax.callbacks.disconnect(cid)
+            else:
+                self.ax.figure.canvas.mpl_disconnect(cid)
+        self.callbacks = []
+
+    def set_reveal(self, t):
+        # Only slices before t are drawn; used to sweep the chart in
+        self.reveal = t
+        self.render()
+        self.ax.figure.canvas.draw_idle()
+
+    def render(self):
+        x0, x1 = self.ax.get_xlim()
+        x1 = min(x1, self.reveal)
+        width = max(int(self.ax.bbox.width), 1)
+        lo = int(np.searchsorted(self.end, x0, side='right'))
+        hi = int(np.searchsorted(self.start, x1, side='left'))
+        exact = hi - lo <= width
+        if x1 <= x0 or hi <= lo:
+            left = right = index = np.empty(0, dtype=np.int64)
+        elif exact:
+            index = np.arange(lo, hi)
+            left = np.maximum(self.start[lo:hi], x0)
+            right = np.minimum(self.end[lo:hi], x1)
+        else:
+            left, right, index = self._aggregate(x0, x1, width, lo, hi)
+
+        verts = np.empty((len(index), 4, 2))
+        verts[:, 0, 0] = verts[:, 1, 0] = left
+        verts[:, 2, 0] = verts[:, 3, 0] = right
+        verts[:, 0, 1] = verts[:, 3, 1] = self.y
+        verts[:, 1, 1] = verts[:, 2, 1] = self.y + self.height
+        self.collection.set_verts(verts)
+        colors = self.color_index[index]
+        self.collection.set_facecolors(self.rgba[colors % len(self.rgba)])
+        self.collection.set_linewidths(1 if exact else 0)
+
+        for text in self.texts:
+            text.remove()
+        self.texts = []
+        if exact and len(index) <= LABEL_LIMIT:
+            pixels = width / (x1 - x0) if x1 > x0 else 0
+            for l, r, i in zip(left.tolist(), right.tolist(), colors.tolist()):
+                if (r - l) * pixels >= MIN_LABEL_PIXELS:
+                    self.texts.append(self.ax.text(
+                        (l + r) / 2, self.y + self.height / 2, self.names[i],
+                        ha='center', va='center', fontsize=12, color=self.edgecolor, fontweight='bold',
+                    ))
+
+    def _aggregate(self, x0, x1, width, lo, hi):
+        # Sample the slice under each pixel column's center, then merge runs
+        # of columns showing the same slice color
+        edges = np.linspace(x0, x1, width + 1)
+        centers = (edges[:-1] + edges[1:]) / 2
+        index = np.searchsorted(self.start[lo:hi], centers, side='right') - 1 + lo
+        valid = (index >= lo) & (self.end[np.maximum(index, lo)] > centers)
+        color = np.where(valid, self.color_index[np.maximum(index, lo)], -1)
+        change = np.flatnonzero(np.diff(color)) + 1
+        first = np.concatenate(([0], change))
+        last = np.concatenate((change, [width]))
+        keep = color[first] >= 0
+        first, last = first[keep], last[keep]
+        return edges[first], edges[last], index[first]
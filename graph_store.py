@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from rag_history import EventLog
+from resource_graph import ResourceAllocationGraph
+
+# Session-keyed resource allocation graphs for the Flask server. Each graph
+# has its own lock, so requests for different sessions never wait on each
+# other; the store lock is only held for bookkeeping. Idle sessions are
+# evicted, and least recently used sessions go first once the store holds
+# more than max_sessions graphs or max_items nodes, edges and logged events
+# in total. Each graph keeps an EventLog of its mutations.
+
+IDLE_TIMEOUT = 30 * 60
+MAX_SESSIONS = 500
+MAX_ITEMS = 5_000_000
+
+
+class _Entry:
+    def __init__(self):
+        self.graph = ResourceAllocationGraph(history=EventLog())
+        self.lock = threading.RLock()
+        self.last_used = time.monotonic()
+        self.users = 0
+        self.size = 0
+
+
+class GraphStore:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS, max_items=MAX_ITEMS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_items = max_items
+        self.entries = OrderedDict()  # session_id: _Entry, least recently used first
+        self.total_size = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def session(self, session_id):
+        with self.lock:
+            entry = self.entries.get(session_id)
+            if entry is None:
+                entry = self.entries[session_id] = _Entry()
+            self.entries.move_to_end(session_id)
+            entry.last_used = time.monotonic()
+            entry.users += 1
+            size = entry.size
+        try:
+            with entry.lock:
+                yield entry.graph
+                size = entry.graph.size() + len(entry.graph.history)
+        finally:
+            with self.lock:
+                entry.users -= 1
+                if self.entries.get(session_id) is entry:
+                    self.total_size += size - entry.size
+                    entry.size = size
+                self._evict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _evict(self):
+        now = time.monotonic()
+        for session_id, entry in list(self.entries.items()):
+            over_cap = len(self.entries) > self.max_sessions or self.total_size > self.max_items
+            idle = now - entry.last_used > self.idle_timeout
+            if not over_cap and not idle:
+                break
+            if entry.users:
+                continue
+            del self.entries[session_id]
+            self.total_size -= entry.size
@@ -0,0 +1,148 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+# Background simulation jobs shared by the Tk app and the Flask server. A
+# job runs fn(job, *args) on a bounded thread pool. Long-running code calls
+# job.report(**fields) now and then (scheduling's progress hook does this
+# every PROGRESS_INTERVAL slices); report stores the fields as the job's
+# progress and raises Cancelled once cancel() has been called, so
+# cancellation is cooperative and takes effect at the next report.
+
+MAX_WORKERS = 2
+MAX_ACTIVE = 16  # queued plus running jobs; submit raises JobLimitError beyond
+KEEP_FINISHED = 100  # finished jobs kept for polling, oldest dropped first
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+
+class Cancelled(Exception):
+    pass
+
+
+class JobLimitError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished_at = None
+        self.future = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def report(self, **fields):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        # Swap in a new dict so pollers never see one mid-update
+        self.progress = {**self.progress, **fields}
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELLED)
+
+    def wait(self, timeout=None):
+        if self.future is not None:
+            try:
+                self.future.result(timeout)
+            except Exception:
+                pass  # the outcome is in status and error
+        return self.finished
+
+    def _finish(self, status, result=None, error=None):
+        if self.finished:
+            return
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        self.status = status
+        metrics.JOBS.inc((self.kind, status))
+
+    def snapshot(self):
+        # JSON-friendly view without the result
+        end = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'elapsed': end - self.started if self.started else 0,
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS, max_active=MAX_ACTIVE, keep_finished=KEEP_FINISHED):
+        self.max_active = max_active
+        self.keep_finished = keep_finished
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.jobs = OrderedDict()  # id: Job, oldest first
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args, kind='job', **kwargs):
+        with self.lock:
+            self._evict()
+            if sum(not job.finished for job in self.jobs.values()) >= self.max_active:
+                raise JobLimitError(f"At most {self.max_active} jobs can be queued or running")
+            job = Job(kind)
+            self.jobs[job.id] = job
+            job.future = self.pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def shutdown(self):
+        # Cancel everything and let running jobs stop at their next report
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_event.is_set():
+            job._finish(CANCELLED)
+            return
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            result = fn(job, *args, **kwargs)
+        except Cancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            job._finish(FAILED, error=str(e) or type(e).__name__)
+        else:
+            job._finish(DONE, result)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self.jobs[job_id]
+
+
+# Shared by the Flask endpoints and the Tk app
+manager = JobManager()
@@ -0,0 +1,135 @@
+import bisect
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# Process-wide counters and timers for the Flask app and the simulation
+# loops. render() returns them in the Prometheus text exposition format.
+# Each metric's values are keyed by a tuple of label values in labelnames
+# order; sweep worker processes keep their own copies, which are not merged.
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+
+_registry = []
+_lock = threading.Lock()
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, labels=(), amount=1):
+        with _lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def _render(self, lines):
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+
+
+class Timer:
+    # A Prometheus histogram of durations in seconds
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels: [per-bucket counts, count, sum]
+        _registry.append(self)
+
+    def observe(self, labels, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with _lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            state[0][i] += 1
+            state[1] += 1
+            state[2] += seconds
+
+    @contextmanager
+    def time(self, labels=()):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, perf_counter() - start)
+
+    def _render(self, lines):
+        for labels, (counts, count, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ('+Inf',), counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, labels, [('le', bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_count{label_text} {count}")
+            lines.append(f"{self.name}_sum{label_text} {total}")
+
+
+def render():
+    lines = []
+    with _lock:
+        for metric in _registry:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            metric._render(lines)
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        for metric in _registry:
+            metric.values.clear()
+
+
+HTTP_REQUESTS = Counter('http_requests_total', "HTTP requests by route, method and status",
+                        ('route', 'method', 'status'))
+HTTP_LATENCY = Timer('http_request_duration_seconds', "HTTP request latency by route", ('route', 'method'))
+
+SCHEDULER_RUNS = Counter('scheduler_runs_total', "Scheduler runs", ('algorithm',))
+SCHEDULER_SECONDS = Timer('scheduler_run_seconds', "Scheduler run time", ('algorithm',))
+SCHEDULER_PROCESSES = Counter('scheduler_processes_total', "Processes scheduled", ('algorithm',))
+SCHEDULER_SLICES = Counter('scheduler_slices_total', "CPU slices emitted", ('algorithm',))
+SCHEDULER_CONTEXT_SWITCHES = Counter('scheduler_context_switches_total', "Context switches", ('algorithm',))
+SCHEDULER_QUEUE_OPS = Counter('scheduler_ready_queue_ops_total', "Ready queue pushes and pops", ('algorithm',))
+
+# edge_insert is graph build (incremental order upkeep), order_rebuild the
+# full SCC pass it falls back to, cycle_search collecting deadlocked
+# components and cycle listing, matrix_build and matrix_detect the
+# Available/Allocation/Request detector
+RAG_SECONDS = Timer('rag_phase_seconds', "Resource allocation graph time by phase", ('phase',))
+
+IMAGE_CACHE = Counter('image_cache_requests_total', "Rendered chart lookups by chart kind and cache result",
+                      ('kind', 'result'))
+
+# memory and disk are hits in the in-process LRU and the on-disk store
+RESULT_CACHE = Counter('schedule_cache_requests_total', "Schedule result cache lookups by outcome", ('result',))
+
+JOBS = Counter('jobs_total', "Background jobs finished by kind and final status", ('kind', 'status'))
+
+
+def record_scheduler_run(algo, seconds, stats, queue_ops):
+    labels = (algo,)
+    SCHEDULER_RUNS.inc(labels)
+    SCHEDULER_SECONDS.observe(labels, seconds)
+    SCHEDULER_PROCESSES.inc(labels, stats.get('completed', 0))
+    SCHEDULER_SLICES.inc(labels, stats.get('slices', 0))
+    SCHEDULER_CONTEXT_SWITCHES.inc(labels, stats.get('context_switches', 0))
+    SCHEDULER_QUEUE_OPS.inc(labels, queue_ops)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from schedule_table import Schedule
+from stats import StatsCollector
+
+# Columnar process table: one int array per field instead of one dict per
+# process. Used for large workloads where per-process dicts cost too much.
+
+
+class ProcessTable:
+    def __init__(self, pid, arrival, burst, priority):
+        self.pid = np.asarray(pid, dtype=np.int64)
+        self.arrival = np.asarray(arrival, dtype=np.int64)
+        self.burst = np.asarray(burst, dtype=np.int64)
+        self.priority = np.asarray(priority, dtype=np.int32)
+        if not (len(self.pid) == len(self.arrival) == len(self.burst) == len(self.priority)):
+            raise ValueError("Process table columns must have the same length")
+
+    @classmethod
+    def from_dicts(cls, procs):
+        return cls(
+            [p['pid'] for p in procs],
+            [p['arrival'] for p in procs],
+            [p['burst'] for p in procs],
+            [p.get('priority', 0) for p in procs],
+        )
+
+    def to_dicts(self):
+        return [
+            {'pid': pid, 'arrival': arrival, 'burst': burst, 'priority': priority}
+            for pid, arrival, burst, priority in zip(
+                self.pid.tolist(), self.arrival.tolist(), self.burst.tolist(), self.priority.tolist()
+            )
+        ]
+
+    def __len__(self):
+        return len(self.pid)
+
+    @property
+    def nbytes(self):
+        return self.pid.nbytes + self.arrival.nbytes + self.burst.nbytes + self.priority.nbytes
+
+    def take(self, order):
+        return ProcessTable(self.pid[order], self.arrival[order], self.burst[order], self.priority[order])
+
+    def sorted_by_arrival(self):
+        # Traces are usually already in arrival order, so skip the sort when we can
+        if len(self) < 2 or np.all(self.arrival[1:] >= self.arrival[:-1]):
+            return self
+        return self.take(np.argsort(self.arrival, kind='stable'))
+
+    def iter_arrivals(self, first_index=0, chunk_size=1 << 16):
+        # (index, pid, arrival, burst, priority) tuples in arrival order, ties
+        # in table order, converted a chunk at a time
+        order = None
+        if len(self) > 1 and not np.all(self.arrival[1:] >= self.arrival[:-1]):
+            order = np.argsort(self.arrival, kind='stable')
+        for lo in range(0, len(self), chunk_size):
+            rows = np.arange(lo, min(lo + chunk_size, len(self))) if order is None else order[lo:lo + chunk_size]
+            yield from zip(
+                (rows + first_index).tolist(), self.pid[rows].tolist(), self.arrival[rows].tolist(),
+                self.burst[rows].tolist(), self.priority[rows].tolist(),
+            )
+
+
+def fcfs_times(arrival, burst, start_time=0):
+    # finish[i] = max(finish[i-1], arrival[i]) + burst[i] with finish[-1] = start_time,
+    # unrolled into finish[i] = cumsum(burst)[i] +
+    # max(start_time, max_{j<=i}(arrival[j] - cumsum(burst)[j-1]))
+    total = np.cumsum(burst)
+    slack = np.maximum.accumulate(arrival - (total - burst))
+    finish = total + np.maximum(slack, start_time)
+    return finish - burst, finish
+
+
+def FCFS(table, keep_schedule=True):
+    table = table.sorted_by_arrival()
+    collector = StatsCollector()
+    start, finish = fcfs_times(table.arrival, table.burst)
+    collector.add_batch(table.arrival, table.burst, start, finish)
+    schedule = Schedule(table.pid, start, finish).compact() if keep_schedule else None
+    return schedule, collector.result()
@@ -1,11 +1,14 @@
 import tkinter as tk
-from tkinter import ttk, simpledialog, messagebox
+from tkinter import ttk, simpledialog, messagebox, filedialog
 import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import threading
-import random
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import networkx as nx
+import gantt
+import jobs
+import result_cache
+import scheduling
+import sweep
+from resource_graph import ResourceAllocationGraph, process_node, resource_node
 
 # Modern color scheme
 COLORS = {
@@ -19,6 +22,22 @@ COLORS = {
     'text_dim': '#9399b2'
 }
 
+GANTT_ANIMATION_FRAMES = 60
+JOB_POLL_MS = 200
+
+def describe_progress(progress):
+    # Short text for a job's progress fields (see jobs.py)
+    parts = []
+    if 'runs' in progress:
+        parts.append(f"run {progress['runs_done']}/{progress['runs']}")
+    if 'algorithm' in progress:
+        parts.append(progress['algorithm'])
+    if 'time' in progress:
+        parts.append(f"t={progress['time']}")
+    if 'completed' in progress:
+        parts.append(f"{progress['completed']} processes done")
+    return ", ".join(parts)
+
 class ModernButton(tk.Button):
     def __init__(self, master=None, **kwargs):
         super().__init__(master, **kwargs)
@@ -87,61 +106,6 @@ class CustomNotebook(ttk.Notebook):
             self.select(index)
         self._active = None
 
-class ResourceAllocationGraph:
-    def __init__(self):
-        self.processes = set()
-        self.resources = {}  # resource_id: total_instances
-        self.allocation = {}  # (process_id, resource_id): instances
-        self.requests = {}   # (process_id, resource_id): instances
-        
-    def add_process(self, pid):
-        self.processes.add(pid)
-        
-    def add_resource(self, rid, instances):
-        self.resources[rid] = instances
-        
-    def allocate(self, pid, rid, instances):
-        if instances <= self.resources.get(rid, 0):
-            self.allocation[(pid, rid)] = instances
-            return True
-        return False
-        
-    def request(self, pid, rid, instances):
-        if instances <= self.resources.get(rid, 0):
-            self.requests[(pid, rid)] = instances
-            return True
-        return False
-        
-    def detect_deadlock(self):
-        G = nx.DiGraph()
-        
-        # Add all processes and resources as nodes
-        for p in self.processes:
-            G.add_node(f"P{p}", type="process")
-        for r in self.resources:
-            G.add_node(f"R{r}", type="resource")
-            
-        # Add edges for allocations (Resource → Process)
-        for (pid, rid), instances in self.allocation.items():
-            G.add_edge(f"R{rid}", f"P{pid}", weight=instances)
-            
-        # Add edges for requests (Process → Resource)
-        for (pid, rid), instances in self.requests.items():
-            G.add_edge(f"P{pid}", f"R{rid}", weight=instances)
-            
-        # Detect cycles in the graph
-        try:
-            cycles = list(nx.simple_cycles(G))
-            return len(cycles) > 0, cycles
-        except:
-            return False, []
-            
-    def clear(self):
-        self.processes.clear()
-        self.resources.clear()
-        self.allocation.clear()
-        self.requests.clear()
-
 class SchedulerApp:
     def __init__(self, root):
         self.root = root
@@ -162,6 +126,7 @@ class SchedulerApp:
         self.processes = []
         self.quantum = 2
         self.rag = ResourceAllocationGraph()
+        self.job = None  # the background run in progress, if any
 
         self.setup_ui()
 
@@ -209,6 +174,17 @@ class SchedulerApp:
         )
         add_btn.pack(side=tk.LEFT, padx=10)
 
+        # Replay a CSV or binary trace file with every algorithm
+        trace_btn = ModernButton(
+            control_frame,
+            text="Replay Trace",
+            font=self.font_small,
+            bg=COLORS['accent1'],
+            fg=COLORS['bg_dark'],
+            command=self.replay_trace
+        )
+        trace_btn.pack(side=tk.LEFT, padx=10)
+
         # Quantum Input Frame
         quantum_frame = tk.Frame(control_frame, bg=COLORS['bg_dark'])
         quantum_frame.pack(side=tk.LEFT, padx=20)
@@ -236,6 +212,29 @@ class SchedulerApp:
         self.quantum_entry.delete(0, "end")
         self.quantum_entry.insert(0, "2")
 
+        # Objective used to pick the winning algorithm
+        objective_frame = tk.Frame(control_frame, bg=COLORS['bg_dark'])
+        objective_frame.pack(side=tk.LEFT, padx=20)
+
+        tk.Label(
+            objective_frame,
+            text="Optimize:",
+            font=self.font_small,
+            bg=COLORS['bg_dark'],
+            fg=COLORS['text']
+        ).pack(side=tk.LEFT)
+
+        self.objective_var = tk.StringVar(value='avg_wt')
+        objective_menu = tk.OptionMenu(objective_frame, self.objective_var, *sweep.OBJECTIVES)
+        objective_menu.config(
+            font=self.font_small,
+            bg=COLORS['bg_light'],
+            fg=COLORS['text'],
+            relief=tk.FLAT,
+            highlightthickness=0
+        )
+        objective_menu.pack(side=tk.LEFT, padx=5)
+
         # Process List Frame
         list_frame = tk.Frame(self.scheduler_frame, bg=COLORS['bg_dark'])
         list_frame.pack(fill='both', expand=True, padx=20, pady=20)
@@ -268,6 +267,18 @@ class SchedulerApp:
         )
         self.start_btn.pack(side=tk.LEFT, padx=10)
 
+        # Cancel Button, enabled while a background run is in progress
+        self.cancel_btn = ModernButton(
+            btn_frame,
+            text="Cancel",
+            font=self.font_small,
+            bg=COLORS['accent4'],
+            fg=COLORS['bg_dark'],
+            command=self.cancel_sim,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=10)
+
         # Reset Button
         self.reset_btn = ModernButton(
             btn_frame,
@@ -284,11 +295,12 @@ class SchedulerApp:
         self.stats_frame.pack(pady=20)
         
         # Stats Labels with modern styling
+        self.job_status_var = tk.StringVar(value="")
         self.avg_waiting_var = tk.StringVar(value="Average Waiting Time: N/A")
         self.avg_turnaround_var = tk.StringVar(value="Average Turnaround Time: N/A")
         self.avg_response_var = tk.StringVar(value="Average Response Time: N/A")
         
-        for var in [self.avg_waiting_var, self.avg_turnaround_var, self.avg_response_var]:
+        for var in [self.job_status_var, self.avg_waiting_var, self.avg_turnaround_var, self.avg_response_var]:
             tk.Label(
                 self.stats_frame,
                 textvariable=var,
@@ -301,6 +313,8 @@ class SchedulerApp:
         self.fig, self.ax = plt.subplots(figsize=(14, 6))
         self.setup_gantt_chart()
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.scheduler_frame)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.scheduler_frame, pack_toolbar=False)
+        self.gantt = None
 
     def setup_deadlock_ui(self):
         # Title
@@ -322,6 +336,7 @@ class SchedulerApp:
             ("Add Resource", COLORS['accent1'], self.add_resource),
             ("Add Request", COLORS['accent2'], self.add_request),
             ("Add Allocation", COLORS['accent3'], self.add_allocation),
+            ("Release", COLORS['accent1'], self.release_allocation),
             ("Detect Deadlock", COLORS['accent4'], self.detect_deadlock),
             ("Reset", COLORS['accent2'], self.reset_rag)
         ]
@@ -396,7 +411,10 @@ class SchedulerApp:
             
         if self.rag.request(pid, rid, instances):
             self.update_rag_visualization()
-            messagebox.showinfo("Success", f"Request from P{pid} for {instances} instances of {rid} added.")
+            if self.rag.closes_cycle(process_node(pid), resource_node(rid)):
+                messagebox.showwarning("Cycle Formed", f"Request from P{pid} for {rid} closes a cycle in the graph.")
+            else:
+                messagebox.showinfo("Success", f"Request from P{pid} for {instances} instances of {rid} added.")
         else:
             messagebox.showerror("Error", "Invalid request. Check resource availability.")
 
@@ -423,11 +441,40 @@ class SchedulerApp:
         else:
             messagebox.showerror("Error", "Invalid allocation. Check resource availability.")
 
+    def release_allocation(self):
+        pid = simpledialog.askinteger("Input", "Enter Process ID:", parent=self.root, minvalue=1)
+        if not pid:
+            return
+
+        rid = simpledialog.askstring("Input", "Enter Resource ID:", parent=self.root)
+        if not rid:
+            return
+
+        held = self.rag.allocation.get((pid, rid))
+        if held is None:
+            messagebox.showerror("Error", f"P{pid} holds no instances of {rid}.")
+            return
+        instances = simpledialog.askinteger("Input", f"Instances to release (P{pid} holds {held}):", parent=self.root,
+                                            minvalue=1, maxvalue=max(held, 1), initialvalue=held)
+        if not instances:
+            return
+
+        # None gives back everything, including an empty allocation
+        if self.rag.release(pid, rid, None if instances >= held else instances):
+            self.update_rag_visualization()
+            messagebox.showinfo("Success", f"P{pid} released {min(instances, held)} instances of {rid}.")
+        else:
+            messagebox.showerror("Error", "Invalid release.")
+
     def detect_deadlock(self):
-        has_deadlock, cycles = self.rag.detect_deadlock()
-        if has_deadlock:
+        has_deadlock, cycles = self.rag.detect_deadlock(max_cycles=10, time_budget=1.0)
+        deadlocked = self.rag.deadlocked_processes()
+        if has_deadlock and deadlocked:
             cycle_str = "\n".join([" → ".join(cycle) for cycle in cycles])
-            messagebox.showwarning("Deadlock Detected", f"Deadlock detected!\nCycles found:\n{cycle_str}")
+            proc_str = ", ".join(f"P{pid}" for pid in deadlocked)
+            messagebox.showwarning("Deadlock Detected", f"Deadlock detected!\nDeadlocked processes: {proc_str}\nCycles found:\n{cycle_str}")
+        elif has_deadlock:
+            messagebox.showinfo("No Deadlock", "The graph has a cycle, but spare resource instances let every process finish.")
         else:
             messagebox.showinfo("No Deadlock", "No deadlock detected in the system.")
 
@@ -538,6 +585,7 @@ class SchedulerApp:
         self.proc_listbox.delete(0, tk.END)
         self.clear_canvas()
         self.canvas.get_tk_widget().pack_forget()
+        self.toolbar.pack_forget()
         self.avg_waiting_var.set("Average Waiting Time: N/A")
         self.avg_turnaround_var.set("Average Turnaround Time: N/A")
         self.avg_response_var.set("Average Response Time: N/A")
@@ -548,219 +596,149 @@ class SchedulerApp:
             messagebox.showwarning("No Processes", "Please add at least one process.", parent=self.root)
             return
         try:
-            self.quantum = int(self.quantum_entry.get())
+            quantum = int(self.quantum_entry.get())
         except Exception:
-            messagebox.showerror("Invalid Quantum", "Quantum must be an integer.", parent=self.root)
+            quantum = 0
+        if quantum < 1:
+            messagebox.showerror("Invalid Quantum", "Quantum must be a positive integer.", parent=self.root)
             return
+        self.quantum = quantum
         
-        # Suggest the best algorithm automatically
-        algorithm = self.suggest_best_algorithm()
-        messagebox.showinfo("Suggested Algorithm", f"The suggested algorithm is: {algorithm}", parent=self.root)
-
-        threading.Thread(target=self.run_scheduler, args=(algorithm,), daemon=True).start()
-
-    def suggest_best_algorithm(self):
-        if len(self.processes) == 0:
-            return "First Come First Serve"
-
-        burst_times = [p['burst'] for p in self.processes]
-        priorities = [p['priority'] for p in self.processes]
-        arrival_times = [p['arrival'] for p in self.processes]
-
-        arrival_range = max(arrival_times) - min(arrival_times) if arrival_times else 0
-        burst_range = max(burst_times) - min(burst_times) if burst_times else 0
+        # Measure every algorithm on this workload and run the best one
+        self.submit_job(self.suggest_and_run, list(self.processes), self.objective_var.get(), kind='suggest')
+
+    def submit_job(self, fn, *args, kind):
+        # One background run at a time; the Cancel button stops it at its
+        # next progress report
+        if self.job is not None and not self.job.finished:
+            messagebox.showinfo("Simulation Running",
+                                "A simulation is already running. Cancel it or wait for it to finish.", parent=self.root)
+            return
+        try:
+            self.job = jobs.manager.submit(fn, *args, kind=kind)
+        except jobs.JobLimitError as e:
+            messagebox.showerror("Busy", str(e), parent=self.root)
+            return
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.job_status_var.set("Running...")
+        self.root.after(JOB_POLL_MS, self.poll_job, self.job)
 
-        if arrival_range <= 1 and burst_range == 0:
-            return "First Come First Serve"
-        elif burst_range > 0 and len(set(burst_times)) == len(burst_times):
-            return "Shortest Job First"
-        elif len(set(priorities)) < len(priorities):
-            return "Priority Scheduling"
-        else:
-            return "Round Robin"
-
-    def run_scheduler(self, algo):
-        proc_list = [dict(p) for p in self.processes]
-        if algo == "First Come First Serve":
-            schedule, stats = self.FCFS(proc_list)
-        elif algo == "Shortest Job First":
-            schedule, stats = self.SJF(proc_list)
-        elif algo == "Round Robin":
-            schedule, stats = self.RR(proc_list, self.quantum)
-        elif algo == "Priority Scheduling":
-            schedule, stats = self.Priority(proc_list)
+    def poll_job(self, job):
+        if job is not self.job:
+            return
+        if not job.finished:
+            self.job_status_var.set(f"Running... {describe_progress(job.progress)}".rstrip())
+            self.root.after(JOB_POLL_MS, self.poll_job, job)
+            return
+        self.cancel_btn.config(state=tk.DISABLED)
+        if job.status == jobs.CANCELLED:
+            self.job_status_var.set("Cancelled")
+        elif job.status == jobs.FAILED:
+            self.job_status_var.set("")
+            messagebox.showerror("Simulation Failed", job.error, parent=self.root)
         else:
-            schedule, stats = [], {}
-        self.root.after(0, lambda: self.show_and_animate_gantt(schedule, stats))
+            self.job_status_var.set("")
+            self.show_outcome(job.result or {})
+
+    def show_outcome(self, outcome):
+        # Jobs run on worker threads and only return what to show; Tk is
+        # touched here, on the main thread
+        if 'gantt' in outcome:
+            self.show_and_animate_gantt(*outcome['gantt'])
+        if 'error' in outcome:
+            messagebox.showerror(*outcome['error'], parent=self.root)
+        if 'info' in outcome:
+            messagebox.showinfo(*outcome['info'], parent=self.root)
+
+    def cancel_sim(self):
+        if self.job is not None and not self.job.finished:
+            self.job.cancel()
+            self.job_status_var.set("Cancelling...")
+
+    def replay_trace(self):
+        path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Open Trace",
+            filetypes=[("Trace files", "*.csv *.trace *.bin"), ("All files", "*")]
+        )
+        if not path:
+            return
+        try:
+            quantum = int(self.quantum_entry.get())
+        except ValueError:
+            quantum = 0
+        if quantum < 1:
+            messagebox.showerror("Invalid Quantum", "Quantum must be a positive integer.", parent=self.root)
+            return
+        self.submit_job(self.replay_and_report, path, self.objective_var.get(), quantum, kind='trace')
+
+    def replay_and_report(self, job, path, objective, quantum):
+        try:
+            tasks = sweep.make_tasks(scheduling.ALGORITHMS, [quantum])
+            results = sweep.rank(sweep.run_tasks(path, tasks, progress=job.report), objective)
+        except (OSError, ValueError) as e:
+            return {'error': ("Trace Error", str(e))}
+        lines = [f"{row['algorithm']}: {row[objective]:.2f}" for row in results]
+        message = f"{results[0]['completed']} processes, {objective} by algorithm:\n" + "\n".join(lines)
+        return {'info': ("Trace Replay", message)}
+
+    def suggest_and_run(self, job, procs, objective):
+        best = self.suggest_best_algorithm(procs, objective, progress=job.report)
+        algorithm = best['algorithm']
+        label = f"{algorithm} (quantum {best['quantum']})" if best['quantum'] else algorithm
+        message = f"The suggested algorithm is: {label}\nBest {objective}: {best[objective]:.2f}"
+        job.report(algorithm=algorithm)
+        schedule, stats = self.run_scheduler(algorithm, best['quantum'] or self.quantum, procs=procs,
+                                             progress=job.report)
+        return {'gantt': (schedule, stats), 'info': ("Suggested Algorithm", message)}
+
+    def suggest_best_algorithm(self, procs=None, objective='avg_wt', progress=None):
+        procs = self.processes if procs is None else procs
+        if len(procs) == 0:
+            return {'algorithm': "First Come First Serve", 'quantum': None, objective: 0}
+        quanta = set(sweep.DEFAULT_QUANTA) | {self.quantum}
+        return sweep.sweep(procs, quanta=quanta, objective=objective, progress=progress)[0]
+
+    def run_scheduler(self, algo, quantum=None, procs=None, progress=None):
+        # Job threads pass the snapshot they were submitted with, so edits made
+        # in the UI meanwhile don't leak into the run
+        procs = list(self.processes) if procs is None else procs
+        return result_cache.run_algorithm(algo, procs, quantum or self.quantum, progress=progress)
 
     def FCFS(self, procs):
-        schedule = []
-        procs = sorted(procs, key=lambda p: p['arrival'])
-        current_time = 0
-        waiting_times = {}
-        response_times = {}
-        start_times = {}
-        for p in procs:
-            start = max(current_time, p['arrival'])
-            if p['pid'] not in start_times:
-                start_times[p['pid']] = start
-                response_times[p['pid']] = start - p['arrival']
-            finish = start + p['burst']
-            waiting_times[p['pid']] = start - p['arrival']
-            schedule.append({'pid': p['pid'], 'start': start, 'end': finish})
-            current_time = finish
-        turnaround_times = {s['pid']: s['end'] - next(p['arrival'] for p in procs if p['pid'] == s['pid']) for s in schedule}
-        avg_wt = sum(waiting_times.values()) / len(waiting_times) if waiting_times else 0
-        avg_tat = sum(turnaround_times.values()) / len(turnaround_times) if turnaround_times else 0
-        avg_rt = sum(response_times.values()) / len(response_times) if response_times else 0
-        stats = {'avg_wt': avg_wt, 'avg_tat': avg_tat, 'avg_rt': avg_rt}
-        return schedule, stats
+        return scheduling.FCFS(procs)
 
     def SJF(self, procs):
-        procs = sorted(procs, key=lambda p: p['arrival'])
-        ready_queue = []
-        schedule = []
-        time = 0
-        left = procs.copy()
-        waiting_times = {}
-        response_times = {}
-        first_response = {}
-        while left or ready_queue:
-            for p in left:
-                if p['arrival'] <= time:
-                    ready_queue.append(p)
-            left = [p for p in left if p['arrival'] > time]
-            if ready_queue:
-                p = min(ready_queue, key=lambda p: p['burst'])
-                ready_queue.remove(p)
-                start = max(time, p['arrival'])
-                if p['pid'] not in first_response:
-                    first_response[p['pid']] = start - p['arrival']
-                finish = start + p['burst']
-                waiting_times[p['pid']] = start - p['arrival']
-                schedule.append({'pid': p['pid'], 'start': start, 'end': finish})
-                time = finish
-            else:
-                time += 1
-        turnaround_times = {s['pid']: s['end'] - next(p['arrival'] for p in procs if p['pid'] == s['pid']) for s in schedule}
-        avg_wt = sum(waiting_times.values()) / len(waiting_times) if waiting_times else 0
-        avg_tat = sum(turnaround_times.values()) / len(turnaround_times) if turnaround_times else 0
-        avg_rt = sum(first_response.values()) / len(first_response) if first_response else 0
-        stats = {'avg_wt': avg_wt, 'avg_tat': avg_tat, 'avg_rt': avg_rt}
-        return schedule, stats
+        return scheduling.SJF(procs)
 
     def RR(self, procs, quantum):
-        procs = [dict(p) for p in procs]
-        for p in procs:
-            p['remaining'] = p['burst']
-        ready_queue = []
-        schedule = []
-        time = 0
-        left = procs
-        waiting_times = {p['pid']: 0 for p in procs}
-        first_response = {}
-
-        while left or ready_queue:
-            for p in left:
-                if p['arrival'] <= time and p not in ready_queue:
-                    ready_queue.append(p)
-            left = [p for p in left if p['arrival'] > time]
-            if ready_queue:
-                p = ready_queue.pop(0)
-                start_time = time
-                if p['pid'] not in first_response:
-                    first_response[p['pid']] = start_time - p['arrival']
-                exec_time = min(p['remaining'], quantum)
-                time += exec_time
-                p['remaining'] -= exec_time
-                schedule.append({'pid': p['pid'], 'start': start_time, 'end': time})
-                for q in ready_queue:
-                    waiting_times[q['pid']] += exec_time
-                if p['remaining'] > 0:
-                    ready_queue.append(p)
-                else:
-                    waiting_times[p['pid']] = waiting_times.get(p['pid'], 0) + time - p['arrival'] - p['burst']
-            else:
-                time += 1
-
-        turnaround_times = {s['pid']: s['end'] - next(p['arrival'] for p in procs if p['pid'] == s['pid']) for s in schedule}
-        avg_wt = sum(waiting_times.values()) / len(waiting_times) if waiting_times else 0
-        avg_tat = sum(turnaround_times.values()) / len(turnaround_times) if turnaround_times else 0
-        avg_rt = sum(first_response.values()) / len(first_response) if first_response else 0
-        stats = {'avg_wt': avg_wt, 'avg_tat': avg_tat, 'avg_rt': avg_rt}
-        return schedule, stats
+        return scheduling.RR(procs, quantum)
 
     def Priority(self, procs):
-        schedule = []
-        time = 0
-        procs = sorted(procs, key=lambda p: (p['arrival'], p['priority']))
-        left = procs.copy()
-        waiting_times = {}
-        first_response = {}
-        while left:
-            available = [p for p in left if p['arrival'] <= time]
-            if not available:
-                time = left[0]['arrival']
-                continue
-            p = min(available, key=lambda x: x['priority'])
-            start = max(time, p['arrival'])
-            if p['pid'] not in first_response:
-                first_response[p['pid']] = start - p['arrival']
-            finish = start + p['burst']
-            waiting_times[p['pid']] = start - p['arrival']
-            schedule.append({'pid': p['pid'], 'start': start, 'end': finish})
-            time = finish
-            left.remove(p)
-
-        turnaround_times = {s['pid']: s['end'] - next(p['arrival'] for p in procs if p['pid'] == s['pid']) for s in schedule}
-        avg_wt = sum(waiting_times.values()) / len(waiting_times) if waiting_times else 0
-        avg_tat = sum(turnaround_times.values()) / len(turnaround_times) if turnaround_times else 0
-        avg_rt = sum(first_response.values()) / len(first_response) if first_response else 0
-        stats = {'avg_wt': avg_wt, 'avg_tat': avg_tat, 'avg_rt': avg_rt}
-        return schedule, stats
+        return scheduling.Priority(procs)
 
     def show_and_animate_gantt(self, schedule, stats):
+        self.toolbar.pack(side=tk.BOTTOM, fill=tk.X, padx=20)
         self.canvas.get_tk_widget().pack(pady=20, padx=20, fill=tk.BOTH, expand=True)
         self.clear_canvas()
         
         # Modern color palette for processes
         colors = [COLORS['accent1'], COLORS['accent2'], COLORS['accent3'], 
                  COLORS['accent4'], '#f38ba8', '#fab387', '#89dceb']
-        p_colors = {}
-        for p in self.processes:
-            if p['pid'] not in p_colors:
-                p_colors[p['pid']] = random.choice(colors)
-
-        max_time = max([task['end'] for task in schedule]) if schedule else 1
-        bars = []
-        for task in schedule:
-            pid = task['pid']
-            start = task['start']
-            end = task['end']
-            color = p_colors.get(pid, COLORS['accent1'])
-            bar = mpatches.Rectangle((start, 0.5), 0, 0.5, 
-                                   facecolor=color,
-                                   edgecolor=COLORS['text'],
-                                   linewidth=2)
-            self.ax.add_patch(bar)
-            bars.append((bar, start, end, f"P{pid}"))
+        # Bars are batched and re-aggregated on zoom, pan and resize, so
+        # large schedules stay responsive
+        gantt_chart = self.gantt = gantt.GanttRenderer(self.ax, schedule, colors, edgecolor=COLORS['text'])
+        max_time = schedule.makespan or 1
 
         self.ax.set_xlim(0, max_time + 1)
         self.ax.set_ylim(0, 1)
-        self.ax.set_xticks(range(0, int(max_time) + 2))
         self.ax.tick_params(axis='x', colors=COLORS['text'], labelsize=14)
         self.ax.tick_params(axis='y', colors=COLORS['text'], labelsize=14)
         self.ax.set_yticks([])
         self.ax.set_facecolor(COLORS['bg_light'])
 
         # Modern legend
-        patches = [mpatches.Patch(color=color, 
-                                label=f"P{pid}",
-                                edgecolor=COLORS['text'],
-                                linewidth=1) 
-                  for pid, color in p_colors.items()]
-        
-        self.ax.legend(handles=patches,
+        self.ax.legend(handles=gantt_chart.legend_handles(),
                       bbox_to_anchor=(1.05, 1),
                       loc='upper left',
                       fontsize=14,
@@ -775,41 +753,27 @@ class SchedulerApp:
         self.ax.set_xlabel("Time",
                           fontsize=20,
                           color=COLORS['text'])
-        self.canvas.draw_idle()
-
-        def animate_bar(idx=0):
-            if idx >= len(bars):
-                self.avg_waiting_var.set(f"Average Waiting Time: {stats['avg_wt']:.2f}")
-                self.avg_turnaround_var.set(f"Average Turnaround Time: {stats['avg_tat']:.2f}")
-                self.avg_response_var.set(f"Average Response Time: {stats['avg_rt']:.2f}")
+        self.toolbar.update()
+
+        # Sweep the chart in over a fixed number of frames, however many
+        # slices the schedule has
+        def animate(frame=1):
+            if self.gantt is not gantt_chart:
+                return  # a newer run replaced this chart
+            gantt_chart.set_reveal(max_time * frame / GANTT_ANIMATION_FRAMES)
+            if frame < GANTT_ANIMATION_FRAMES:
+                self.root.after(30, animate, frame + 1)
                 return
-            bar, start, end, label = bars[idx]
-            width = end - start
-            step = width / 30.0
-            cur_width = 0
-
-            def grow():
-                nonlocal cur_width
-                if cur_width >= width:
-                    self.ax.text(start + width / 2, 0.75,
-                               label,
-                               ha='center',
-                               va='center',
-                               fontsize=16,
-                               color=COLORS['text'],
-                               fontweight='bold')
-                    self.canvas.draw_idle()
-                    animate_bar(idx + 1)
-                    return
-                cur_width += step
-                bar.set_width(cur_width)
-                self.canvas.draw_idle()
-                self.root.after(30, grow)
-            grow()
-
-        animate_bar()
+            self.avg_waiting_var.set(f"Average Waiting Time: {stats['avg_wt']:.2f}")
+            self.avg_turnaround_var.set(f"Average Turnaround Time: {stats['avg_tat']:.2f}")
+            self.avg_response_var.set(f"Average Response Time: {stats['avg_rt']:.2f}")
+
+        animate()
 
     def clear_canvas(self):
+        if self.gantt is not None:
+            self.gantt.disconnect()
+            self.gantt = None
         self.ax.cla()
         self.ax.set_title("Gantt Chart", fontsize=28, color='black')
         self.ax.set_xlabel("Time", fontsize=24, color='black')
@@ -823,4 +787,5 @@ class SchedulerApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = SchedulerApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    jobs.manager.shutdown()
\ No newline at end of file
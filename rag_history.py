@@ -0,0 +1,117 @@
+import bisect
+
+from resource_graph import ResourceAllocationGraph
+
+# Append-only log of the mutations accepted by a ResourceAllocationGraph,
+# with periodic snapshots so the graph can be rebuilt as of any event by
+# replaying from the nearest checkpoint instead of from the start.
+#
+#   log = EventLog()
+#   rag = ResourceAllocationGraph(history=log)
+#   ...
+#   log.state_at(n)        # graph after the first n events
+#   log.first_deadlock()   # smallest such n that is deadlocked
+#
+# A checkpoint is taken once the events since the last one reach both
+# CHECKPOINT_INTERVAL and the size of the graph, so snapshot memory stays
+# proportional to the number of events and rebuilding from a checkpoint
+# costs about as much as replaying the events after it.
+
+CHECKPOINT_INTERVAL = 1024
+
+
+class EventLog:
+    def __init__(self, checkpoint_interval=CHECKPOINT_INTERVAL):
+        self.checkpoint_interval = checkpoint_interval
+        self.events = []  # (method name, args), oldest first
+        self.offsets = [0]  # number of events each checkpoint was taken after
+        self.snapshots = [ResourceAllocationGraph().snapshot()]
+        self.first_cycle = None  # events up to the first cycle, once known
+        self.checked = 0  # events up to which no cycle has been seen
+        self.next_checkpoint = checkpoint_interval  # event count at which to check again
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, rag, name, args):
+        self.events.append((name, args))
+        # Noted as events arrive while the graph tracks cycles edge by edge;
+        # a stale graph (bulk changes, large reorders) is not rebuilt per
+        # event, and first_deadlock catches up from the last checked event
+        if self.first_cycle is None and self.checked == len(self.events) - 1 and not rag.stale:
+            if rag.has_deadlock():
+                self.first_cycle = len(self.events)
+            else:
+                self.checked = len(self.events)
+        if len(self.events) < self.next_checkpoint:
+            return
+        # Measuring the graph is not free, so only when one may be due
+        size = rag.size()
+        if len(self.events) - self.offsets[-1] >= size:
+            self.offsets.append(len(self.events))
+            self.snapshots.append(rag.snapshot())
+            self.next_checkpoint = len(self.events) + self.checkpoint_interval
+        else:
+            self.next_checkpoint = self.offsets[-1] + size
+
+    def state_at(self, n):
+        # A new graph, without history, as it was after the first n events
+        if not 0 <= n <= len(self.events):
+            raise ValueError(f"Event must be between 0 and {len(self.events)}")
+        checkpoint = bisect.bisect_right(self.offsets, n) - 1
+        return self._replay(checkpoint, n)
+
+    def first_deadlock(self, multi_instance=False):
+        # Smallest n whose state is deadlocked, or None. By default a cycle
+        # counts, and since cycles are tracked incrementally the first one
+        # is found exactly, replaying any events not checked as they were
+        # recorded. multi_instance uses deadlocked_processes, which
+        # accounts for spare instances but is too costly to run per event:
+        # it binary searches the checkpoints, then the events after the last
+        # deadlock-free one, so it assumes a deadlock persists once it
+        # appears. A release or clear that breaks one can hide an earlier
+        # onset.
+        if not multi_instance:
+            if self.first_cycle is None and self.checked < len(self.events):
+                self._find_first_cycle()
+            return self.first_cycle
+
+        def deadlocked(rag):
+            return bool(rag.deadlocked_processes())
+
+        if not deadlocked(self.state_at(len(self.events))):
+            return None
+
+        lo, hi = 0, len(self.offsets) - 1  # offsets[0] is the empty graph
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if deadlocked(ResourceAllocationGraph.from_snapshot(self.snapshots[mid])):
+                hi = mid - 1
+            else:
+                lo = mid
+        checkpoint = lo
+        clean = self.offsets[checkpoint]
+        bad = self.offsets[checkpoint + 1] if checkpoint + 1 < len(self.offsets) else len(self.events)
+        while bad - clean > 1:
+            mid = (clean + bad) // 2
+            if deadlocked(self._replay(checkpoint, mid)):
+                bad = mid
+            else:
+                clean = mid
+        return bad
+
+    def _find_first_cycle(self):
+        checkpoint = bisect.bisect_right(self.offsets, self.checked) - 1
+        rag = self._replay(checkpoint, self.checked)
+        for name, args in self.events[self.checked:]:
+            getattr(rag, name)(*args)
+            if rag.has_deadlock():
+                self.first_cycle = self.checked + 1
+                return
+            self.checked += 1
+
+    def _replay(self, checkpoint, n):
+        rag = ResourceAllocationGraph.from_snapshot(self.snapshots[checkpoint])
+        for name, args in self.events[self.offsets[checkpoint]:n]:
+            getattr(rag, name)(*args)
+        return rag
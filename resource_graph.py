@@ -0,0 +1,641 @@
+import copy
+import time
+import uuid
+
+import networkx as nx
+import numpy as np
+
+import metrics
+
+# Resource allocation graph shared by the Flask server and the Tkinter app.
+# Allocation edges run R{rid} -> P{pid}, request edges P{pid} -> R{rid}.
+#
+# The graph is maintained as allocate/request mutate state. Cycles are
+# tracked over the condensation: every strongly connected component is
+# collapsed to one representative, and those are kept in a Pearce-Kelly
+# incremental topological order. An edge that agrees with the order costs
+# nothing; otherwise only the components between its endpoints in the
+# order are searched and reordered, and if the edge closes a cycle the
+# components on it are merged into one. When that search passes
+# REORDER_LIMIT components, or on the bulk paths (apply_batch,
+# from_snapshot), edges are only added to the graph and the components and
+# order are recomputed in one SCC pass the next time they are needed.
+# Removing an edge only rechecks the component it was inside, if any.
+#
+# With a history (see rag_history.EventLog), every accepted mutation is
+# appended to it as (method name, args), so the graph can be rebuilt as of
+# any earlier event.
+
+
+# Operation name accepted by apply_batch: method it maps to
+BATCH_OPERATIONS = {
+    'process': 'add_process',
+    'resource': 'add_resource',
+    'allocate': 'allocate',
+    'request': 'request',
+    'release': 'release',
+    'max_claim': 'set_max_claim',
+}
+
+REORDER_LIMIT = 256  # components an insert may search before a full rebuild is cheaper
+
+
+def find_deadlocked(available, allocation, requests):
+    # Classic detection algorithm (Available / Allocation / Request).
+    # Processes holding nothing cannot be deadlocked. Every round releases
+    # all processes whose requests fit in Work at once, which only grows
+    # Work, so the result matches the one-at-a-time version.
+    work = np.array(available, dtype=np.int64)
+    pending = np.flatnonzero(allocation.any(axis=1))
+    while pending.size:
+        can_finish = (requests[pending] <= work).all(axis=1)
+        if not can_finish.any():
+            break
+        work += allocation[pending[can_finish]].sum(axis=0)
+        pending = pending[~can_finish]
+    return pending
+
+
+def find_safe_sequence(available, allocation, need):
+    # Banker's safety check; returns row indices in a safe order or None
+    work = np.array(available, dtype=np.int64)
+    pending = np.arange(len(allocation))
+    order = []
+    while pending.size:
+        can_finish = (need[pending] <= work).all(axis=1)
+        if not can_finish.any():
+            return None
+        done = pending[can_finish]
+        order.extend(done.tolist())
+        work += allocation[done].sum(axis=0)
+        pending = pending[~can_finish]
+    return order
+
+
+def replay_is_safe(available, allocation, need):
+    # True if the rows can finish in exactly the given order: each row's need
+    # must fit in Available plus everything released by the rows before it
+    if not len(allocation):
+        return True
+    released = np.cumsum(allocation, axis=0) - allocation
+    return bool((need <= available + released).all())
+
+
+def process_node(pid):
+    return f"P{pid}"
+
+
+def resource_node(rid):
+    return f"R{rid}"
+
+
+class ResourceAllocationGraph:
+    def __init__(self, history=None):
+        self.processes = set()
+        self.resources = {}  # resource_id: total_instances
+        self.allocation = {}  # (process_id, resource_id): instances
+        self.requests = {}   # (process_id, resource_id): instances
+        self.allocated = {}  # resource_id: instances currently allocated
+        self.max_claims = {}  # (process_id, resource_id): maximum instances
+        self.cached_sequence = None  # last safe sequence found
+        self.safe_dirty = True  # allocations or claims changed since
+        self.graph = nx.DiGraph()
+        self.comp = {}  # node: representative of its strongly connected component
+        self.members = {}  # representative: nodes of its component
+        self.order = {}  # representative: position in topological order of the condensation
+        self.next_order = 0
+        self.succ = {}  # representative: {representative: edges between the two}
+        self.pred = {}
+        self.cyclic = set()  # representatives of components that contain a cycle
+        self.stale = False  # components and order need a rebuild before use
+        self.uid = uuid.uuid4().hex[:12]
+        self.version = 0  # bumped on every mutation
+        self.cache = {}  # results derived from the current version
+        self.history = history  # EventLog of accepted mutations, or None
+
+    def add_process(self, pid):
+        self._touch()
+        self.processes.add(pid)
+        self._add_node(process_node(pid), "process")
+        self._record('add_process', pid)
+
+    def add_resource(self, rid, instances):
+        self._touch()
+        self.resources[rid] = instances
+        self._add_node(resource_node(rid), "resource")
+        self._record('add_resource', rid, instances)
+
+    def available(self, rid):
+        return self.resources.get(rid, 0) - self.allocated.get(rid, 0)
+
+    def allocate(self, pid, rid, instances):
+        # Replaces any existing allocation of rid to pid, so that one is
+        # given back before checking what is free
+        held = self.allocation.get((pid, rid), 0)
+        if instances <= self.available(rid) + held:
+            self._touch()
+            self.allocation[(pid, rid)] = instances
+            self.allocated[rid] = self.allocated.get(rid, 0) + instances - held
+            self.safe_dirty = True
+            self._add_node(process_node(pid), "process")
+            self._add_node(resource_node(rid), "resource")
+            self._add_edge(resource_node(rid), process_node(pid), instances)
+            self._record('allocate', pid, rid, instances)
+            return True
+        return False
+
+    def release(self, pid, rid, instances=None):
+        # Gives back instances of rid held by pid (all of them by default);
+        # the allocation edge goes once nothing is held
+        held = self.allocation.get((pid, rid))
+        if held is None:
+            return False
+        if instances is None:
+            instances = held
+        elif not 0 < instances <= held:
+            return False
+        self._touch()
+        self.allocated[rid] -= instances
+        self.safe_dirty = True
+        if instances < held:
+            self.allocation[(pid, rid)] = held - instances
+            self.graph[resource_node(rid)][process_node(pid)]["weight"] = held - instances
+        else:
+            del self.allocation[(pid, rid)]
+            self._remove_edge(resource_node(rid), process_node(pid))
+        self._record('release', pid, rid, instances)
+        return True
+
+    def request(self, pid, rid, instances):
+        if instances <= self.resources.get(rid, 0):
+            self._touch()
+            self.requests[(pid, rid)] = instances
+            self._add_node(process_node(pid), "process")
+            self._add_node(resource_node(rid), "resource")
+            self._add_edge(process_node(pid), resource_node(rid), instances)
+            self._record('request', pid, rid, instances)
+            return True
+        return False
+
+    def cached(self, key, compute):
+        # Memoizes compute() until the next mutation
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def size(self):
+        return self.graph.number_of_nodes() + self.graph.number_of_edges()
+
+    def closes_cycle(self, u, v):
+        # True if the edge u -> v lies on a cycle
+        self._sync()
+        return self.graph.has_edge(u, v) and self.comp[u] == self.comp[v] and self.comp[u] in self.cyclic
+
+    def has_deadlock(self):
+        self._sync()
+        return bool(self.cyclic)
+
+    def detect_deadlock(self, max_cycles=0, time_budget=None):
+        # Deadlock is answered from the tracked components; listing cycles
+        # is opt-in and capped, see iter_cycles
+        if not self.has_deadlock():
+            return False, []
+        return True, self.cached(('cycles', max_cycles, time_budget), lambda: self._list_cycles(max_cycles, time_budget))
+
+    def _list_cycles(self, max_cycles, time_budget):
+        with metrics.RAG_SECONDS.time(('cycle_search',)):
+            return list(self.iter_cycles(max_cycles, time_budget))
+
+    def deadlocked_nodes(self):
+        return self.cached('deadlocked_nodes', self._deadlocked_nodes)
+
+    def _deadlocked_nodes(self):
+        nodes = set()
+        with metrics.RAG_SECONDS.time(('cycle_search',)):
+            for component in self._cyclic_components():
+                nodes |= component
+        return nodes
+
+    def iter_cycles(self, max_cycles=None, time_budget=None):
+        # Yields at most max_cycles elementary cycles (None for no cap) and
+        # stops once time_budget seconds have passed. Enumeration only runs
+        # inside deadlocked components, one component at a time.
+        if max_cycles == 0:
+            return
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        found = 0
+        for component in self._cyclic_components():
+            for cycle in nx.simple_cycles(self.graph.subgraph(component)):
+                yield cycle
+                found += 1
+                if max_cycles is not None and found >= max_cycles:
+                    return
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+
+    def _cyclic_components(self):
+        # Strongly connected components that contain a cycle
+        self._sync()
+        for rep in self.cyclic:
+            yield self.members[rep]
+
+    def matrices(self):
+        # Available vector plus Allocation and Request matrices, rows in
+        # sorted process order and columns in resource insertion order
+        pids, rids, index = self._matrix_index()
+        available = np.array([self.available(rid) for rid in rids], dtype=np.int64)
+        return pids, rids, available, self._matrix(self.allocation, index), self._matrix(self.requests, index)
+
+    def deadlocked_processes(self):
+        # Multi-instance detection: unlike a cycle, this accounts for spare
+        # instances that let a process on a cycle finish anyway
+        return self.cached('deadlocked_processes', self._deadlocked_processes)
+
+    def _deadlocked_processes(self):
+        with metrics.RAG_SECONDS.time(('matrix_build',)):
+            pids, _, available, allocation, requests = self.matrices()
+        with metrics.RAG_SECONDS.time(('matrix_detect',)):
+            deadlocked = find_deadlocked(available, allocation, requests)
+        return [pids[i] for i in deadlocked]
+
+    def set_max_claim(self, pid, rid, instances):
+        # Banker's avoidance: the most of rid that pid may ever hold
+        if instances < self.allocation.get((pid, rid), 0) or instances > self.resources.get(rid, 0):
+            return False
+        self._touch()
+        self.max_claims[(pid, rid)] = instances
+        self.safe_dirty = True
+        self._record('set_max_claim', pid, rid, instances)
+        return True
+
+    def need(self, pid, rid):
+        return max(self.max_claims.get((pid, rid), 0) - self.allocation.get((pid, rid), 0), 0)
+
+    def safe_sequence(self):
+        # Cached until allocations or claims change; after a change the old
+        # sequence is replayed first (a single pass), and the full round-based
+        # safety check only runs if it no longer works
+        if not self.safe_dirty:
+            return self.cached_sequence
+        pids, _, available, allocation, need = self._banker_matrices()
+        sequence = None
+        if self.cached_sequence is not None and set(self.cached_sequence) == set(pids):
+            row = {pid: i for i, pid in enumerate(pids)}
+            order = np.array([row[pid] for pid in self.cached_sequence], dtype=np.int64)
+            if replay_is_safe(available, allocation[order], need[order]):
+                sequence = self.cached_sequence
+        if sequence is None:
+            order = find_safe_sequence(available, allocation, need)
+            sequence = None if order is None else [pids[i] for i in order]
+        self.cached_sequence = sequence
+        self.safe_dirty = False
+        return sequence
+
+    def can_grant(self, pid, rid, instances):
+        return self._check_grant(pid, rid, instances) is not None
+
+    def grant(self, pid, rid, instances):
+        sequence = self._check_grant(pid, rid, instances)
+        if sequence is None:
+            return False
+        self.allocate(pid, rid, self.allocation.get((pid, rid), 0) + instances)
+        self.cached_sequence = sequence
+        self.safe_dirty = False
+        return True
+
+    def _check_grant(self, pid, rid, instances):
+        # Returns a safe sequence for the state after the grant, or None
+        if instances <= 0 or instances > self.need(pid, rid) or instances > self.available(rid):
+            return None
+        sequence = self.safe_sequence()
+        if sequence is None:
+            return None
+        # Granting only lowers Work[rid] by instances until pid finishes and
+        # hands everything back, so the cached sequence stays safe as long as
+        # every process ahead of pid still fits in the smaller rid column
+        work = self.available(rid) - instances
+        for p in sequence:
+            if p == pid:
+                return sequence
+            if self.need(p, rid) > work:
+                break
+            work += self.allocation.get((p, rid), 0)
+        # Some other order may still be safe: try the grant for real
+        held = self.allocation.get((pid, rid), 0)
+        cached, dirty = self.cached_sequence, self.safe_dirty
+        self.allocation[(pid, rid)] = held + instances
+        self.allocated[rid] = self.allocated.get(rid, 0) + instances
+        self.safe_dirty = True
+        sequence = self.safe_sequence()
+        self.allocated[rid] -= instances
+        if held:
+            self.allocation[(pid, rid)] = held
+        else:
+            del self.allocation[(pid, rid)]
+        self.cached_sequence, self.safe_dirty = cached, dirty
+        return sequence
+
+    def _banker_matrices(self):
+        pids, rids, index = self._matrix_index()
+        available = np.array([self.available(rid) for rid in rids], dtype=np.int64)
+        allocation = self._matrix(self.allocation, index)
+        need = np.maximum(self._matrix(self.max_claims, index) - allocation, 0)
+        return pids, rids, available, allocation, need
+
+    def _matrix_index(self):
+        pids = {pid for pid, _ in self.allocation} | {pid for pid, _ in self.requests} | {pid for pid, _ in self.max_claims}
+        pids = sorted(self.processes | pids, key=str)
+        rids = list(self.resources)
+        return pids, rids, ({pid: i for i, pid in enumerate(pids)}, {rid: j for j, rid in enumerate(rids)})
+
+    def _matrix(self, table, index):
+        row, col = index
+        matrix = np.zeros((len(row), len(col)), dtype=np.int64)
+        if table:
+            keys = list(table)
+            matrix[[row[pid] for pid, _ in keys], [col[rid] for _, rid in keys]] = list(table.values())
+        return matrix
+
+    def apply_batch(self, operations):
+        # operations is a list of (name, args) with name one of
+        # BATCH_OPERATIONS. All or nothing: the batch is tried on a scratch
+        # copy first and only replayed here if every operation succeeds.
+        history, self.history = self.history, None
+        try:
+            trial = copy.deepcopy(self)
+        finally:
+            self.history = history
+        # Neither copy keeps its order up to date edge by edge; both are
+        # rebuilt at most once, when next asked about cycles
+        trial.stale = True
+        errors = []
+        for index, (name, args) in enumerate(operations):
+            if name not in BATCH_OPERATIONS:
+                errors.append({"index": index, "message": f"Unknown operation: {name}"})
+            elif getattr(trial, BATCH_OPERATIONS[name])(*args) is False:
+                errors.append({"index": index, "message": f"{name} rejected: check resource availability"})
+        if errors:
+            return errors
+        self.stale = True
+        for name, args in operations:
+            getattr(self, BATCH_OPERATIONS[name])(*args)
+        return []
+
+    def get_graph_data(self):
+        return self.cached('graph_data', self._graph_data)
+
+    def _graph_data(self):
+        nodes = []
+        edges = []
+
+        for node, node_type in self.graph.nodes(data="type"):
+            nodes.append({
+                "id": node,
+                "label": node,
+                "type": node_type
+            })
+
+        for (u, v) in self.graph.edges():
+            edge_type = "allocation" if self.graph.nodes[u]["type"] == "resource" else "request"
+            edges.append({
+                "from": u,
+                "to": v,
+                "type": edge_type
+            })
+
+        return {"nodes": nodes, "edges": edges}
+
+    def clear(self):
+        self._touch()
+        self.processes.clear()
+        self.resources.clear()
+        self.allocation.clear()
+        self.requests.clear()
+        self.allocated.clear()
+        self.max_claims.clear()
+        self.cached_sequence = None
+        self.safe_dirty = True
+        self.graph.clear()
+        self.comp.clear()
+        self.members.clear()
+        self.order.clear()
+        self.next_order = 0
+        self.succ.clear()
+        self.pred.clear()
+        self.cyclic.clear()
+        self.stale = False
+        self._record('clear')
+
+    def snapshot(self):
+        # Compact copy of the state: enough to rebuild the graph with
+        # from_snapshot, without the history or derived caches
+        return (list(self.graph.nodes(data="type")), tuple(self.processes), dict(self.resources),
+                dict(self.allocation), dict(self.requests), dict(self.max_claims))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        nodes, processes, resources, allocation, requests, max_claims = snapshot
+        rag = cls()
+        rag.stale = True
+        for node, node_type in nodes:
+            rag._add_node(node, node_type)
+        rag.processes.update(processes)
+        rag.resources.update(resources)
+        rag.max_claims.update(max_claims)
+        # Edges are restored directly: allocate() would re-check
+        # availability against resources that may have shrunk since
+        for (pid, rid), instances in allocation.items():
+            rag.allocation[(pid, rid)] = instances
+            rag.allocated[rid] = rag.allocated.get(rid, 0) + instances
+            rag._add_edge(resource_node(rid), process_node(pid), instances)
+        for (pid, rid), instances in requests.items():
+            rag.requests[(pid, rid)] = instances
+            rag._add_edge(process_node(pid), resource_node(rid), instances)
+        return rag
+
+    def _record(self, name, *args):
+        if self.history is not None:
+            self.history.record(self, name, args)
+
+    def _touch(self):
+        self.version += 1
+        self.cache.clear()
+
+    def _add_node(self, node, node_type):
+        if node not in self.comp:
+            self.graph.add_node(node, type=node_type)
+            self.comp[node] = node
+            self.members[node] = {node}
+            self.order[node] = self.next_order
+            self.next_order += 1
+            self.succ[node] = {}
+            self.pred[node] = {}
+
+    def _add_edge(self, u, v, weight):
+        if self.graph.has_edge(u, v):
+            self.graph[u][v]["weight"] = weight
+            return
+        start = time.perf_counter()
+        self.graph.add_edge(u, v, weight=weight)
+        if not self.stale:
+            cu, cv = self.comp[u], self.comp[v]
+            if cu == cv:
+                if u == v:
+                    self.cyclic.add(cu)
+            elif not self._insert_ordered(cu, cv):
+                self.stale = True
+        metrics.RAG_SECONDS.observe(('edge_insert',), time.perf_counter() - start)
+
+    def _remove_edge(self, u, v):
+        self.graph.remove_edge(u, v)
+        if self.stale:
+            return
+        cu, cv = self.comp[u], self.comp[v]
+        if cu != cv:
+            self._unlink(cu, cv)
+        elif u == v:
+            if len(self.members[cu]) == 1:
+                self.cyclic.discard(cu)
+        elif not nx.is_strongly_connected(self.graph.subgraph(self.members[cu])):
+            # The component splits; its parts need slots of their own
+            self.stale = True
+
+    def _link(self, cu, cv, count=1):
+        self.succ[cu][cv] = self.succ[cu].get(cv, 0) + count
+        self.pred[cv][cu] = self.pred[cv].get(cu, 0) + count
+
+    def _unlink(self, cu, cv):
+        if self.succ[cu][cv] > 1:
+            self.succ[cu][cv] -= 1
+            self.pred[cv][cu] -= 1
+        else:
+            del self.succ[cu][cv]
+            del self.pred[cv][cu]
+
+    def _insert_ordered(self, cu, cv):
+        # Places the condensation edge cu -> cv, merging the components on
+        # any cycle it closes. Returns False, leaving everything untouched,
+        # if more than REORDER_LIMIT components would have to be searched.
+        lower, upper = self.order[cv], self.order[cu]
+        if lower > upper:
+            self._link(cu, cv)
+            return True
+
+        forward = {cv}
+        stack = [cv]
+        while stack:
+            for nxt in self.succ[stack.pop()]:
+                if nxt not in forward and self.order[nxt] <= upper:
+                    forward.add(nxt)
+                    stack.append(nxt)
+            if len(forward) > REORDER_LIMIT:
+                return False
+
+        backward = {cu}
+        stack = [cu]
+        while stack:
+            for prv in self.pred[stack.pop()]:
+                if prv not in backward and self.order[prv] >= lower:
+                    backward.add(prv)
+                    stack.append(prv)
+            if len(forward) + len(backward) > REORDER_LIMIT:
+                return False
+
+        # Everything that reaches cu must now come before everything cv
+        # reaches. On a cycle, the components both reachable from cv and
+        # reaching cu become one, placed between the two groups.
+        slots = sorted(self.order[rep] for rep in backward | forward)
+        cycle = forward & backward
+        backward = sorted(backward - cycle, key=self.order.get)
+        forward = sorted(forward - cycle, key=self.order.get)
+        for rep, slot in zip(backward, slots):
+            self.order[rep] = slot
+        for rep, slot in zip(forward, slots[len(slots) - len(forward):]):
+            self.order[rep] = slot
+        if cycle:
+            self.order[self._merge(cycle)] = slots[len(backward)]
+        else:
+            self._link(cu, cv)
+        return True
+
+    def _merge(self, cycle):
+        # Collapses the components in cycle into the largest of them
+        rep = max(cycle, key=lambda c: len(self.members[c]))
+        succ, pred = {}, {}
+        for c in cycle:
+            for nxt, count in self.succ.pop(c).items():
+                if nxt not in cycle:
+                    succ[nxt] = succ.get(nxt, 0) + count
+                    del self.pred[nxt][c]
+            for prv, count in self.pred.pop(c).items():
+                if prv not in cycle:
+                    pred[prv] = pred.get(prv, 0) + count
+                    del self.succ[prv][c]
+            if c != rep:
+                for node in self.members[c]:
+                    self.comp[node] = rep
+                self.members[rep] |= self.members.pop(c)
+                del self.order[c]
+                self.cyclic.discard(c)
+        self.succ[rep], self.pred[rep] = {}, {}
+        for nxt, count in succ.items():
+            self._link(rep, nxt, count)
+        for prv, count in pred.items():
+            self._link(prv, rep, count)
+        self.cyclic.add(rep)
+        return rep
+
+    def _sync(self):
+        if self.stale:
+            self._rebuild()
+
+    def _rebuild(self):
+        # Components from one SCC pass, then a topological order of the
+        # condensation that keeps each weakly connected piece contiguous,
+        # pieces in node insertion order. A chain growing at either end
+        # then meets its next link right beside it in the order.
+        with metrics.RAG_SECONDS.time(('order_rebuild',)):
+            self.comp, self.members, self.cyclic = {}, {}, set()
+            for component in nx.strongly_connected_components(self.graph):
+                rep = next(iter(component))
+                self.members[rep] = component
+                for node in component:
+                    self.comp[node] = rep
+                if len(component) > 1 or self.graph.has_edge(rep, rep):
+                    self.cyclic.add(rep)
+            self.succ = {rep: {} for rep in self.members}
+            self.pred = {rep: {} for rep in self.members}
+            for u, v in self.graph.edges():
+                if self.comp[u] != self.comp[v]:
+                    self._link(self.comp[u], self.comp[v])
+            self.order = {}
+            seen = set()
+            for node in self.graph:
+                if self.comp[node] in seen:
+                    continue
+                piece = [self.comp[node]]
+                seen.add(piece[0])
+                for rep in piece:
+                    for other in (*self.succ[rep], *self.pred[rep]):
+                        if other not in seen:
+                            seen.add(other)
+                            piece.append(other)
+                # Each component after its predecessors: depth-first
+                # postorder over pred
+                for root in piece:
+                    if root in self.order:
+                        continue
+                    self.order[root] = None  # on the stack
+                    stack = [(root, iter(self.pred[root]))]
+                    while stack:
+                        rep, preds = stack[-1]
+                        for prv in preds:
+                            if prv not in self.order:
+                                self.order[prv] = None
+                                stack.append((prv, iter(self.pred[prv])))
+                                break
+                        else:
+                            stack.pop()
+                            self.order[rep] = self.next_order
+                            self.next_order += 1
+            self.stale = False
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+import scheduling
+from process_table import ProcessTable
+from schedule_table import Schedule
+from sweep import QUANTUM_ALGORITHMS
+
+# Content-addressed cache of (schedule, stats) results. The key is a hash of
+# the process set, the algorithm and, for the algorithms that use one, the
+# quantum, so re-running a workload or switching back to an algorithm that
+# already ran is a lookup. Entries live in an LRU bounded by count and by
+# bytes; with a directory, they are also written there as .npz files and
+# read back after a restart, so the Flask server and the Tk app share
+# results when pointed at the same SCHEDULER_CACHE_DIR.
+#
+# Cached schedules are shared between callers and their arrays are read-only.
+
+KEY_VERSION = 1  # bump when engine output changes so stale disk entries miss
+MAX_ENTRIES = 512
+MAX_BYTES = 256 * 2**20
+MAX_DISK_BYTES = 1 << 30
+ENTRY_OVERHEAD = 4096  # stats dict and bookkeeping per entry
+CACHE_DIR_ENV = 'SCHEDULER_CACHE_DIR'
+
+
+def workload_key(algo, procs, quantum):
+    algo = scheduling.ALIASES.get(algo, algo)
+    digest = hashlib.sha256(json.dumps([KEY_VERSION, algo, quantum if algo in QUANTUM_ALGORITHMS else None])
+                            .encode())
+    if isinstance(procs, ProcessTable):
+        digest.update(b'table')
+        for column in (procs.pid, procs.arrival, procs.burst, procs.priority):
+            digest.update(np.ascontiguousarray(column, dtype='<i8').tobytes())
+    else:
+        rows = [[p['pid'], p['arrival'], p['burst'], p.get('priority', 0)] for p in procs]
+        digest.update(json.dumps(rows, separators=(',', ':')).encode())
+    return digest.hexdigest()
+
+
+def _entry_size(schedule):
+    if schedule is None:
+        return ENTRY_OVERHEAD
+    return schedule.nbytes + 64 * len(schedule.pids or ()) + ENTRY_OVERHEAD
+
+
+def _freeze(schedule):
+    for column in (schedule.proc, schedule.start, schedule.end):
+        column.flags.writeable = False
+    return schedule
+
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, directory=None, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = OrderedDict()  # key: (schedule or None, stats, size), least recently used first
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def run(self, algo, procs, quantum=2, keep_schedule=True, progress=None):
+        # scheduling.run_algorithm through the cache. Stats-only results
+        # (keep_schedule=False, schedule None) are cached too, and a cached
+        # full result answers a stats-only call.
+        algo = scheduling.ALIASES.get(algo, algo)
+        if algo not in scheduling.ALGORITHMS:
+            return None, {}
+        key = workload_key(algo, procs, quantum)
+        entry = self._lookup(key, keep_schedule)
+        if entry is not None:
+            schedule, stats = entry
+            return schedule if keep_schedule else None, dict(stats)
+        metrics.RESULT_CACHE.inc(('miss',))
+        schedule, stats = scheduling.run_algorithm(algo, procs, quantum, keep_schedule, progress)
+        if schedule is not None:
+            _freeze(schedule)
+        self._store(key, schedule, stats)
+        if self.directory:
+            self._save(key, schedule, stats)
+        return schedule if keep_schedule else None, dict(stats)
+
+    def _lookup(self, key, keep_schedule):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[0] is not None or not keep_schedule):
+                self.entries.move_to_end(key)
+                metrics.RESULT_CACHE.inc(('memory',))
+                return entry[:2]
+        if not self.directory:
+            return None
+        loaded = self._load(key)
+        if loaded is None or (loaded[0] is None and keep_schedule):
+            return None
+        metrics.RESULT_CACHE.inc(('disk',))
+        self._store(key, *loaded)
+        return loaded
+
+    def _store(self, key, schedule, stats):
+        size = _entry_size(schedule)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[2]
+            if size <= self.max_bytes:
+                self.entries[key] = (schedule, stats, size)
+                self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted[2]
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _save(self, key, schedule, stats):
+        meta = {'stats': stats, 'pids': None if schedule is None else schedule.pids}
+        columns = {} if schedule is None else {'proc': schedule.proc, 'start': schedule.start, 'end': schedule.end}
+        try:
+            meta_text = json.dumps(meta)
+        except TypeError:
+            return  # pids that JSON cannot hold stay memory-only
+        # Write then rename so a concurrent reader never sees half a file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=np.array(meta_text), **columns)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._prune_disk()
+
+    def _load(self, key):
+        try:
+            with np.load(self._path(key)) as data:
+                meta = json.loads(str(data['meta']))
+                schedule = None
+                if 'proc' in data:
+                    schedule = _freeze(Schedule(data['proc'], data['start'], data['end'], meta['pids']))
+        except (OSError, ValueError, KeyError):
+            return None
+        return schedule, meta['stats']
+
+    def _prune_disk(self):
+        # Oldest files go first once the directory outgrows max_disk_bytes
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Shared by the Flask endpoints and the Tk app
+cache = ResultCache(directory=os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def run_algorithm(algo, procs, quantum=2, keep_schedule=True, progress=None):
+    return cache.run(algo, procs, quantum, keep_schedule, progress)
@@ -0,0 +1,117 @@
+from array import array
+
+import numpy as np
+
+# Columnar schedule: parallel int arrays instead of one dict per slice, with
+# back-to-back slices of the same pid merged into one. proc holds the pid
+# itself, or an index into pids when pids is given (the engines intern pids
+# so string pids from the web client fit in an int column).
+
+RECORD_DTYPE = np.dtype([('pid', '<i8'), ('start', '<i8'), ('end', '<i8')])
+
+
+class Schedule:
+    def __init__(self, proc=(), start=(), end=(), pids=None):
+        self.proc = np.asarray(proc, dtype=np.int64)
+        self.start = np.asarray(start, dtype=np.int64)
+        self.end = np.asarray(end, dtype=np.int64)
+        self.pids = pids
+        if not (len(self.proc) == len(self.start) == len(self.end)):
+            raise ValueError("Schedule columns must have the same length")
+
+    @classmethod
+    def from_dicts(cls, slices):
+        builder = ScheduleBuilder()
+        for s in slices:
+            builder.add(s['pid'], s['start'], s['end'])
+        return builder.build()
+
+    def __len__(self):
+        return len(self.proc)
+
+    def __iter__(self):
+        # (pid, start, end) tuples
+        return zip(self.pid_list(), self.start.tolist(), self.end.tolist())
+
+    @property
+    def nbytes(self):
+        return self.proc.nbytes + self.start.nbytes + self.end.nbytes
+
+    @property
+    def makespan(self):
+        return int(self.end.max()) if len(self) else 0
+
+    def pid_list(self):
+        if self.pids is None:
+            return self.proc.tolist()
+        return [self.pids[code] for code in self.proc.tolist()]
+
+    def to_dicts(self):
+        return [{'pid': pid, 'start': start, 'end': end} for pid, start, end in self]
+
+    def to_json(self):
+        return {
+            'pids': self.pids,
+            'proc': self.proc.tolist(),
+            'start': self.start.tolist(),
+            'end': self.end.tolist(),
+        }
+
+    def compact(self):
+        if len(self) < 2:
+            return self
+        keep = np.ones(len(self), dtype=bool)
+        keep[1:] = (self.proc[1:] != self.proc[:-1]) | (self.start[1:] != self.end[:-1])
+        if keep.all():
+            return self
+        first = np.flatnonzero(keep)
+        last = np.append(first[1:] - 1, len(self) - 1)
+        return Schedule(self.proc[first], self.start[first], self.end[last], self.pids)
+
+    def save(self, path):
+        # A .npy of RECORD_DTYPE records, readable with np.load(mmap_mode='r')
+        records = np.empty(len(self), dtype=RECORD_DTYPE)
+        if self.pids is None:
+            records['pid'] = self.proc
+        else:
+            if not all(isinstance(pid, int) for pid in self.pids):
+                raise ValueError("Only schedules with integer pids can be saved")
+            records['pid'] = np.asarray(self.pids, dtype=np.int64)[self.proc]
+        records['start'] = self.start
+        records['end'] = self.end
+        np.save(path, records)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        records = np.load(path, mmap_mode='r' if mmap else None)
+        return cls(records['pid'], records['start'], records['end'])
+
+
+class ScheduleBuilder:
+    # Appends slices one at a time into 8-byte array slots
+    def __init__(self):
+        self.codes = {}  # pid: index into pids
+        self.pids = []
+        self.proc = array('q')
+        self.start = array('q')
+        self.end = array('q')
+
+    def add(self, pid, start, end):
+        code = self.codes.get(pid)
+        if code is None:
+            code = self.codes[pid] = len(self.pids)
+            self.pids.append(pid)
+        if self.proc and self.proc[-1] == code and self.end[-1] == start:
+            self.end[-1] = end
+            return
+        self.proc.append(code)
+        self.start.append(start)
+        self.end.append(end)
+
+    def build(self):
+        return Schedule(
+            np.array(self.proc, dtype=np.int64),
+            np.array(self.start, dtype=np.int64),
+            np.array(self.end, dtype=np.int64),
+            self.pids,
+        )
@@ -0,0 +1,346 @@
+import heapq
+import sys
+from collections import deque
+from time import perf_counter
+
+import metrics
+from stats import StatsCollector
+
+# Headless scheduling engine shared by the Tkinter app and the Flask server.
+# Every algorithm takes a list of {'pid', 'arrival', 'burst', 'priority'}
+# dicts, a ProcessTable, or an iterator of (index, pid, arrival, burst,
+# priority) tuples already in arrival order (see traces.py), and returns
+# (schedule, stats) where schedule is a columnar Schedule with adjacent
+# slices of the same pid merged. Arrivals are pulled one at a time and per-process state is dropped
+# on completion, so with keep_schedule=False (schedule is then None) memory
+# is bounded by the number of live processes. Stats are collected in the
+# same pass by a StatsCollector keyed on each process's arrival sequence
+# number, so duplicate pids are safe.
+#
+# The numpy-backed modules are imported on first use: schedule_table when a
+# schedule is kept, and process_table never, since a ProcessTable can only
+# exist once something else has imported it. Stats-only runs over dicts
+# therefore never load numpy, which keeps batch.py's startup short.
+
+# Preemptive priority: a waiting process gains one priority level every
+# AGING_INTERVAL time units
+AGING_INTERVAL = 10
+# MLFQ: quantum of level k is quantum * 2**k; the last level is plain RR
+MLFQ_LEVELS = 3
+# A progress callback is called with time and completed keywords every this
+# many slices; it may raise to abandon the run (see jobs.py)
+PROGRESS_INTERVAL = 1 << 14
+
+
+def _is_table(procs):
+    module = sys.modules.get('process_table')
+    return module is not None and isinstance(procs, module.ProcessTable)
+
+
+def arrival_stream(procs):
+    # Ties in arrival time keep submission order
+    if _is_table(procs):
+        return procs.iter_arrivals()
+    if isinstance(procs, (list, tuple)):
+        order = sorted(range(len(procs)), key=lambda i: procs[i]['arrival'])
+        return (
+            (i, procs[i]['pid'], procs[i]['arrival'], procs[i]['burst'], procs[i].get('priority', 0))
+            for i in order
+        )
+    return iter(procs)
+
+
+class SliceLog:
+    # Feeds slices to the collector and, unless keep_schedule is off, the
+    # schedule. run() merges back-to-back runs of the same process.
+    def __init__(self, keep_schedule=True, progress=None):
+        self.progress = progress
+        self.until_progress = PROGRESS_INTERVAL
+        self.schedule = None
+        if keep_schedule:
+            from schedule_table import ScheduleBuilder
+            self.schedule = ScheduleBuilder()
+        self.collector = StatsCollector()
+        self.open = None
+        self.queue_ops = 0  # ready queue pushes plus pops
+
+    def add(self, key, pid, start, end):
+        self.collector.add_slice(key, start, end)
+        if self.schedule is not None:
+            self.schedule.add(pid, start, end)
+        if self.progress is not None:
+            self.until_progress -= 1
+            if not self.until_progress:
+                self.until_progress = PROGRESS_INTERVAL
+                self.progress(time=end, completed=self.collector.completed)
+
+    def run(self, key, pid, start, end):
+        if self.open and self.open[0] == key and self.open[3] == start:
+            self.open[3] = end
+            return
+        self.flush()
+        self.open = [key, pid, start, end]
+
+    def flush(self):
+        if self.open:
+            self.add(*self.open)
+            self.open = None
+
+    def result(self):
+        self.flush()
+        schedule = self.schedule.build() if self.schedule is not None else None
+        return schedule, self.collector.result()
+
+
+def FCFS(procs, log=None):
+    log = log or SliceLog()
+    current_time = 0
+    for seq, (_, pid, arrival, burst, _) in enumerate(arrival_stream(procs)):
+        start = max(current_time, arrival)
+        current_time = start + burst
+        log.collector.add_process(seq, arrival, burst)
+        log.add(seq, pid, start, current_time)
+        log.queue_ops += 2
+    return log.result()
+
+
+def _non_preemptive(procs, pick_key, log):
+    # Ready queue is a heap of (pick_key(burst, priority), seq, pid, burst) so
+    # ties fall back to arrival order
+    log = log or SliceLog()
+    arrivals = arrival_stream(procs)
+    nxt = next(arrivals, None)
+    ready = []
+    time = 0
+    seq = 0
+    while nxt or ready:
+        while nxt and nxt[2] <= time:
+            _, pid, arrival, burst, priority = nxt
+            log.collector.add_process(seq, arrival, burst)
+            heapq.heappush(ready, (pick_key(burst, priority), seq, pid, burst))
+            seq += 1
+            nxt = next(arrivals, None)
+        if not ready:
+            # CPU idle: jump straight to the next arrival
+            time = nxt[2]
+            continue
+        _, key, pid, burst = heapq.heappop(ready)
+        log.add(key, pid, time, time + burst)
+        time += burst
+    log.queue_ops += 2 * seq
+    return log.result()
+
+
+def SJF(procs, log=None):
+    return _non_preemptive(procs, lambda burst, priority: burst, log)
+
+
+def Priority(procs, log=None):
+    return _non_preemptive(procs, lambda burst, priority: priority, log)
+
+
+def RR(procs, quantum, log=None):
+    if quantum < 1:
+        raise ValueError("Quantum must be a positive integer")
+    log = log or SliceLog()
+    arrivals = arrival_stream(procs)
+    nxt = next(arrivals, None)
+    ready = deque()  # [seq, pid, remaining]
+    time = 0
+    seq = 0
+
+    while nxt or ready:
+        if nxt and nxt[2] <= time:
+            # Processes that arrived during the last slice join behind the
+            # preempted process, in submission order
+            batch = []
+            while nxt and nxt[2] <= time:
+                batch.append(nxt)
+                nxt = next(arrivals, None)
+            batch.sort()
+            for _, pid, arrival, burst, _ in batch:
+                log.collector.add_process(seq, arrival, burst)
+                ready.append([seq, pid, burst])
+                seq += 1
+        if not ready:
+            time = nxt[2]
+            continue
+        proc = ready.popleft()
+        exec_time = min(proc[2], quantum)
+        log.add(proc[0], proc[1], time, time + exec_time)
+        time += exec_time
+        proc[2] -= exec_time
+        if proc[2] > 0:
+            ready.append(proc)
+
+    # Every slice is one pop, and one push either on arrival or on requeue
+    log.queue_ops += 2 * log.collector.slices
+    return log.result()
+
+
+def _preemptive(procs, key, log):
+    # Event-driven: the running process is only re-examined when the next
+    # arrival lands or it completes. key(priority, remaining, since, seq)
+    # orders the ready heap, where since is when the process last entered the
+    # ready queue; a newcomer must strictly beat the running process's key to
+    # preempt it.
+    log = log or SliceLog()
+    arrivals = arrival_stream(procs)
+    nxt = next(arrivals, None)
+    ready = []
+    running = None  # (proc, since) with proc = [seq, pid, priority, remaining]
+    time = 0
+    seq = 0
+    preemptions = 0
+
+    while True:
+        while nxt and nxt[2] <= time:
+            _, pid, arrival, burst, priority = nxt
+            log.collector.add_process(seq, arrival, burst)
+            heapq.heappush(ready, (key(priority, burst, time, seq), time, [seq, pid, priority, burst]))
+            seq += 1
+            nxt = next(arrivals, None)
+        if running is None:
+            if not ready:
+                if nxt is None:
+                    break
+                time = nxt[2]
+                continue
+            _, since, proc = heapq.heappop(ready)
+            running = (proc, since)
+        else:
+            proc, since = running
+            if ready and ready[0][0] < key(proc[2], proc[3], since, proc[0]):
+                heapq.heappush(ready, (key(proc[2], proc[3], time, proc[0]), time, proc))
+                _, since, proc = heapq.heappop(ready)
+                running = (proc, since)
+                preemptions += 1
+
+        end = time + proc[3]
+        if nxt:
+            end = min(end, nxt[2])
+        log.run(proc[0], proc[1], time, end)
+        proc[3] -= end - time
+        time = end
+        if proc[3] == 0:
+            running = None
+
+    log.queue_ops += 2 * (seq + preemptions)
+    return log.result()
+
+
+def SRTF(procs, log=None):
+    return _preemptive(procs, lambda priority, remaining, since, seq: (remaining, seq), log)
+
+
+def PreemptivePriority(procs, aging=AGING_INTERVAL, log=None):
+    if not aging:
+        return _preemptive(procs, lambda priority, remaining, since, seq: (priority, since, seq), log)
+    # prio - (now - since) / aging orders the same way as prio * aging + since
+    # for every process at a given instant, so the heap never needs re-keying
+    return _preemptive(
+        procs, lambda priority, remaining, since, seq: (priority * aging + since, seq), log
+    )
+
+
+def MLFQ(procs, quantum, levels=MLFQ_LEVELS, boost=None, log=None):
+    # New processes enter level 0. Using up a level's quantum demotes a
+    # process; an arrival preempts anything below level 0, which then resumes
+    # its remaining quantum from the head of its level. With boost set, every
+    # process moves back to level 0 every boost time units.
+    if quantum < 1:
+        raise ValueError("Quantum must be a positive integer")
+    log = log or SliceLog()
+    arrivals = arrival_stream(procs)
+    nxt = next(arrivals, None)
+    queues = [deque() for _ in range(levels)]  # [seq, pid, remaining, level, budget]
+    queued = 0
+    dispatches = 0
+    time = 0
+    seq = 0
+    next_boost = boost or None
+
+    while nxt or queued:
+        while nxt and nxt[2] <= time:
+            _, pid, arrival, burst, _ = nxt
+            log.collector.add_process(seq, arrival, burst)
+            queues[0].append([seq, pid, burst, 0, quantum])
+            queued += 1
+            seq += 1
+            nxt = next(arrivals, None)
+        if next_boost is not None and time >= next_boost:
+            for lower in queues[1:]:
+                for proc in lower:
+                    proc[3] = 0
+                    proc[4] = quantum
+                queues[0].extend(lower)
+                lower.clear()
+            next_boost = (time // boost + 1) * boost
+        if not queued:
+            time = nxt[2]
+            continue
+
+        lvl = next(k for k, q in enumerate(queues) if q)
+        proc = queues[lvl].popleft()
+        queued -= 1
+        dispatches += 1
+        end = time + min(proc[2], proc[4])
+        if lvl > 0 and nxt:
+            end = min(end, nxt[2])
+        if next_boost is not None:
+            end = min(end, next_boost)
+        log.run(proc[0], proc[1], time, end)
+        proc[2] -= end - time
+        proc[4] -= end - time
+        time = end
+        if proc[2] == 0:
+            continue
+        queued += 1
+        if proc[4] == 0:
+            proc[3] = min(proc[3] + 1, levels - 1)
+            proc[4] = quantum << proc[3]
+            queues[proc[3]].append(proc)
+        else:
+            queues[proc[3]].appendleft(proc)
+
+    # Each dispatch is one pop, and one push either on arrival or on requeue
+    log.queue_ops += 2 * dispatches
+    return log.result()
+
+
+ALGORITHMS = {
+    "First Come First Serve": lambda procs, quantum, log: FCFS(procs, log),
+    "Shortest Job First": lambda procs, quantum, log: SJF(procs, log),
+    "Round Robin": RR,
+    "Priority Scheduling": lambda procs, quantum, log: Priority(procs, log),
+    "Shortest Remaining Time First": lambda procs, quantum, log: SRTF(procs, log),
+    "Preemptive Priority": lambda procs, quantum, log: PreemptivePriority(procs, log=log),
+    "Multilevel Feedback Queue": lambda procs, quantum, log: MLFQ(procs, quantum, log=log),
+}
+
+# Short names used by the web client
+ALIASES = {
+    'fcfs': "First Come First Serve",
+    'sjf': "Shortest Job First",
+    'rr': "Round Robin",
+    'priority': "Priority Scheduling",
+    'srtf': "Shortest Remaining Time First",
+    'ppriority': "Preemptive Priority",
+    'mlfq': "Multilevel Feedback Queue",
+}
+
+
+def run_algorithm(algo, procs, quantum=2, keep_schedule=True, progress=None):
+    algo = ALIASES.get(algo, algo)
+    runner = ALGORITHMS.get(algo)
+    if runner is None:
+        return None, {}
+    log = SliceLog(keep_schedule, progress)
+    start = perf_counter()
+    if _is_table(procs) and algo == "First Come First Serve":
+        schedule, stats = sys.modules['process_table'].FCFS(procs, keep_schedule)
+        log.queue_ops = 2 * stats['completed']
+    else:
+        schedule, stats = runner(procs, quantum, log)
+    metrics.record_scheduler_run(algo, perf_counter() - start, stats, log.queue_ops)
+    return schedule, stats
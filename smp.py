@@ -0,0 +1,383 @@
+import heapq
+from math import inf
+from time import perf_counter
+
+import metrics
+import scheduling
+from schedule_table import ScheduleBuilder
+from stats import StatsCollector
+
+# Multi-core (SMP) scheduling simulation. Every core has its own run queue
+# ordered by the chosen algorithm, and a load balancer decides which queue
+# an arrival joins and moves work between queues:
+#   global: one queue shared by every core
+#   push:   arrivals are dealt to cores round robin, and every PUSH_INTERVAL
+#           time units the busiest core pushes work to the least busy one
+#   steal:  arrivals are dealt to cores round robin, and a core with an empty
+#           queue takes work from the longest queue
+# Migrations take the least urgent entry of the source queue, the one it
+# would run last, so what that core runs next is left alone. With one core
+# every policy gives the same schedule and stats as its scheduling module
+# counterpart.
+# Event-driven: time only advances to the next arrival, slice end or
+# balancing tick, so idle stretches cost nothing.
+
+BALANCERS = ('global', 'push', 'steal')
+PUSH_INTERVAL = 10
+
+# Process record layout
+SEQ, PID, ARRIVAL, BURST, PRIORITY, REMAINING, SINCE, LEVEL, BUDGET, STAMP, INDEX = range(11)
+
+
+class _Policy:
+    # First come first serve; subclasses change the queue order, the slice
+    # length and whether a waiting process can preempt a running one
+    preemptive = False
+    merge_runs = True  # back-to-back runs of a process on a core count as one slice
+
+
+    def __init__(self, quantum):
+        self.quantum = quantum
+        self.counter = 0
+
+    def key(self, proc, front=False):
+        return proc[SEQ]
+
+    def slice_length(self, proc):
+        return proc[REMAINING]
+
+    def started(self, proc):
+        pass
+
+    def running_key(self, proc, ran):
+        # Queue key of a running process that has run ran units of its slice
+        return self.key(proc)
+
+    def requeue(self, proc, ran):
+        # Called when a slice ends with work left; True puts the process at
+        # the head of its queue
+        return False
+
+
+class _SJF(_Policy):
+    def key(self, proc, front=False):
+        return (proc[BURST], proc[SEQ])
+
+
+class _Priority(_Policy):
+    def key(self, proc, front=False):
+        return (proc[PRIORITY], proc[SEQ])
+
+
+class _RR(_Policy):
+    # As in scheduling.RR, a process coming off the CPU goes behind what was
+    # queued before its slice started but ahead of what arrived during it,
+    # arrivals between two slice starts queue in submission order, and
+    # every quantum is its own slice
+    merge_runs = False
+
+    def key(self, proc, front=False):
+        if proc[STAMP] is not None:
+            return (proc[STAMP], -1)
+        return (self.counter, proc[INDEX])
+
+    def started(self, proc):
+        self.counter += 1
+        proc[STAMP] = self.counter
+
+    def slice_length(self, proc):
+        return min(proc[REMAINING], self.quantum)
+
+
+class _SRTF(_Policy):
+    preemptive = True
+
+    def key(self, proc, front=False):
+        return (proc[REMAINING], proc[SEQ])
+
+    def running_key(self, proc, ran):
+        return (proc[REMAINING] - ran, proc[SEQ])
+
+
+class _PreemptivePriority(_Policy):
+    # Same aging as scheduling.PreemptivePriority
+    preemptive = True
+
+    def key(self, proc, front=False):
+        return (proc[PRIORITY] * scheduling.AGING_INTERVAL + proc[SINCE], proc[SEQ])
+
+
+class _MLFQ(_Policy):
+    # Same levels and demotion as scheduling.MLFQ, without priority boost
+    preemptive = True
+
+    def key(self, proc, front=False):
+        self.counter += 1
+        return (proc[LEVEL], -self.counter if front else self.counter)
+
+    def slice_length(self, proc):
+        return min(proc[REMAINING], proc[BUDGET])
+
+    def running_key(self, proc, ran):
+        # Only a process on a higher level preempts
+        return (proc[LEVEL], -inf)
+
+    def requeue(self, proc, ran):
+        proc[BUDGET] -= ran
+        if proc[BUDGET] > 0:
+            return True
+        proc[LEVEL] = min(proc[LEVEL] + 1, scheduling.MLFQ_LEVELS - 1)
+        proc[BUDGET] = self.quantum << proc[LEVEL]
+        return False
+
+
+POLICIES = {
+    "First Come First Serve": _Policy,
+    "Shortest Job First": _SJF,
+    "Round Robin": _RR,
+    "Priority Scheduling": _Priority,
+    "Shortest Remaining Time First": _SRTF,
+    "Preemptive Priority": _PreemptivePriority,
+    "Multilevel Feedback Queue": _MLFQ,
+}
+
+
+def _pop_least_urgent(queue):
+    # Removes and returns the entry the queue would run last. In a heap that
+    # is a leaf, so the last entry moved into its place can only sift up.
+    i = max(range(len(queue) // 2, len(queue)), key=queue.__getitem__)
+    entry = queue[i]
+    last = queue.pop()
+    if i < len(queue):
+        while i:
+            parent = (i - 1) // 2
+            if not last < queue[parent]:
+                break
+            queue[i] = queue[parent]
+            i = parent
+        queue[i] = last
+    return entry
+
+
+class _Machine:
+    def __init__(self, policy, cores, balancer, keep_schedule, progress=None):
+        self.policy = policy
+        self.progress = progress
+        self.cores = cores
+        self.balancer = balancer
+        if balancer == 'global':
+            self.queues = [[]] * cores
+        else:
+            self.queues = [[] for _ in range(cores)]
+        self.running = [None] * cores
+        self.started = [0] * cores
+        self.tokens = [0] * cores  # token of each core's pending slice-end event
+        self.busy = [0] * cores
+        self.slices = [0] * cores
+        self.switches = [0] * cores
+        self.completed = [0] * cores
+        self.last = [None] * cores  # seq of the last process each core ran
+        self.open = [None] * cores  # [proc, start, end] of each core's last run, counted once it ends
+        self.logs = [ScheduleBuilder() for _ in range(cores)] if keep_schedule else None
+        self.collector = StatsCollector()
+        self.events = []  # (slice end, token, core)
+        self.idle = set(range(cores))
+        self.waiting = 0
+        self.migrations = 0
+        self.next_core = 0
+        self.token = 0
+
+    def enqueue(self, c, proc, now, front=False):
+        proc[SINCE] = now
+        heapq.heappush(self.queues[c], (self.policy.key(proc, front), proc[SEQ], proc))
+        self.waiting += 1
+
+    def start(self, c, proc, now):
+        self.running[c] = proc
+        self.started[c] = now
+        self.token += 1
+        self.tokens[c] = self.token
+        self.idle.discard(c)
+        self.policy.started(proc)
+        heapq.heappush(self.events, (now + self.policy.slice_length(proc), self.token, c))
+
+    def stop(self, c, now):
+        # Ends core c's slice at now; returns the process if it has work left
+        proc = self.running[c]
+        start = self.started[c]
+        self.running[c] = None
+        self.tokens[c] = 0
+        self.idle.add(c)
+        ran = now - start
+        if ran:
+            if not self.policy.merge_runs:
+                self.count(c, proc, start, now)
+            else:
+                run = self.open[c]
+                if run is not None and run[0] is proc and run[2] == start:
+                    run[2] = now
+                else:
+                    if run is not None:
+                        self.count(c, *run)
+                    self.open[c] = [proc, start, now]
+        proc[REMAINING] -= ran
+        if proc[REMAINING] == 0:
+            self.completed[c] += 1
+            return None, ran
+        return proc, ran
+
+    def count(self, c, proc, start, end):
+        self.collector.add_slice(proc[SEQ], start, end)
+        self.busy[c] += end - start
+        self.slices[c] += 1
+        if self.last[c] is not None and self.last[c] != proc[SEQ]:
+            self.switches[c] += 1
+        self.last[c] = proc[SEQ]
+        if self.logs is not None:
+            self.logs[c].add(proc[PID], start, end)
+
+    def preempt(self, c, now):
+        proc, ran = self.stop(c, now)
+        self.enqueue(c, proc, now, self.policy.requeue(proc, ran))
+        self.dispatch(c, now)
+
+    def dispatch(self, c, now):
+        queue = self.queues[c]
+        if not queue and self.balancer == 'steal' and self.waiting:
+            victim = max(self.queues, key=len)
+            if victim:
+                self.migrations += 1
+                self.waiting -= 1
+                self.start(c, _pop_least_urgent(victim)[2], now)
+            return
+        if not queue:
+            return
+        self.waiting -= 1
+        self.start(c, heapq.heappop(queue)[2], now)
+
+    def push_balance(self, now):
+        loads = [len(q) + (p is not None) for q, p in zip(self.queues, self.running)]
+        while True:
+            hi = max(range(self.cores), key=loads.__getitem__)
+            lo = min(range(self.cores), key=loads.__getitem__)
+            if loads[hi] - loads[lo] <= 1:
+                break
+            heapq.heappush(self.queues[lo], _pop_least_urgent(self.queues[hi]))
+            loads[hi] -= 1
+            loads[lo] += 1
+            self.migrations += 1
+            if self.running[lo] is None:
+                self.dispatch(lo, now)
+
+    def settle(self, touched, arrived, now):
+        if self.balancer == 'global':
+            queue = self.queues[0]
+            while queue and self.idle:
+                self.dispatch(min(self.idle), now)
+            if self.policy.preemptive and arrived:
+                self.preempt_global(now)
+            return
+        for c in touched:
+            if self.running[c] is None:
+                self.dispatch(c, now)
+            elif self.policy.preemptive:
+                queue = self.queues[c]
+                if queue and queue[0][0] < self.policy.running_key(self.running[c], now - self.started[c]):
+                    self.preempt(c, now)
+        if self.balancer == 'steal':
+            while self.idle and self.waiting:
+                self.dispatch(min(self.idle), now)
+
+    def preempt_global(self, now):
+        # Waiting work preempts the core running the least urgent process
+        queue = self.queues[0]
+        while queue:
+            keys = [self.policy.running_key(self.running[c], now - self.started[c]) for c in range(self.cores)]
+            c = max(range(self.cores), key=keys.__getitem__)
+            if not queue[0][0] < keys[c]:
+                break
+            self.preempt(c, now)
+
+    def run(self, arrivals):
+        nxt = next(arrivals, None)
+        next_tick = PUSH_INTERVAL if self.balancer == 'push' else inf
+        seq = 0
+        until_progress = scheduling.PROGRESS_INTERVAL
+        while nxt or self.events:
+            now = min(nxt[2] if nxt else inf, self.events[0][0] if self.events else inf)
+            if self.waiting and next_tick < now:
+                now = next_tick
+            touched = []
+            while self.events and self.events[0][0] <= now:
+                _, token, c = heapq.heappop(self.events)
+                if token != self.tokens[c]:
+                    continue  # slice was cut short by a preemption
+                proc, ran = self.stop(c, now)
+                if proc is not None:
+                    self.enqueue(c, proc, now, self.policy.requeue(proc, ran))
+                touched.append(c)
+            arrived = False
+            while nxt and nxt[2] <= now:
+                index, pid, arrival, burst, priority = nxt
+                self.collector.add_process(seq, arrival, burst)
+                c = self.next_core
+                self.next_core = (c + 1) % self.cores
+                self.enqueue(c, [seq, pid, arrival, burst, priority, burst, now, 0, self.policy.quantum, None, index],
+                             now)
+                touched.append(c)
+                arrived = True
+                seq += 1
+                nxt = next(arrivals, None)
+            self.settle(touched, arrived, now)
+            if now >= next_tick:
+                self.push_balance(now)
+                next_tick = (now // PUSH_INTERVAL + 1) * PUSH_INTERVAL
+            if self.progress is not None:
+                until_progress -= 1
+                if not until_progress:
+                    until_progress = scheduling.PROGRESS_INTERVAL
+                    self.progress(time=now, completed=sum(self.completed))
+        return self.result()
+
+    def result(self):
+        for c, run in enumerate(self.open):
+            if run is not None:
+                self.count(c, *run)
+        stats = self.collector.result()
+        makespan = stats['makespan']
+        stats['context_switches'] = sum(self.switches)
+        stats['cpu_utilization'] = sum(self.busy) / (makespan * self.cores) if makespan else 0
+        stats['cores'] = self.cores
+        stats['balancer'] = self.balancer
+        stats['migrations'] = self.migrations
+        stats['per_core'] = [
+            {
+                'core': c,
+                'busy_time': self.busy[c],
+                'utilization': self.busy[c] / makespan if makespan else 0,
+                'completed': self.completed[c],
+                'throughput': self.completed[c] / makespan if makespan else 0,
+                'slices': self.slices[c],
+                'context_switches': self.switches[c],
+            }
+            for c in range(self.cores)
+        ]
+        schedules = [log.build() for log in self.logs] if self.logs is not None else []
+        return schedules, stats
+
+
+def simulate(algo, procs, cores=4, balancer='steal', quantum=2, keep_schedule=True, progress=None):
+    # Returns (one Schedule per core, stats); stats has the single-CPU keys,
+    # with utilization over all cores, plus a per_core breakdown
+    algo = scheduling.ALIASES.get(algo, algo)
+    if algo not in POLICIES:
+        raise ValueError(f"Unknown scheduling algorithm: {algo}")
+    if balancer not in BALANCERS:
+        raise ValueError(f"Unknown load balancer: {balancer}")
+    if cores < 1 or quantum < 1:
+        raise ValueError("Cores and quantum must be positive")
+    start = perf_counter()
+    machine = _Machine(POLICIES[algo](quantum), cores, balancer, keep_schedule, progress)
+    schedules, stats = machine.run(scheduling.arrival_stream(procs))
+    metrics.record_scheduler_run(f"{algo} (SMP)", perf_counter() - start, stats, 2 * stats['slices'])
+    return schedules, stats
@@ -3,6 +3,9 @@ let network = null;
 let data = null;
 let isInitialized = false;
 
+// Only the first few cycles are listed; every deadlocked node is highlighted
+const MAX_LISTED_CYCLES = 10;
+
 // Network options
 const options = {
     nodes: {
@@ -215,9 +218,12 @@ async function addEdge() {
 
 // Detect deadlock
 async function detectDeadlock() {
-    const result = await apiCall('/api/detect_deadlock');
+    const result = await apiCall(`/api/detect_deadlock?max_cycles=${MAX_LISTED_CYCLES}`);
     
-    if (result.has_deadlock) {
+    if (result.has_deadlock && result.deadlocked_processes.length === 0) {
+        // Multi-instance resources: a cycle alone is not a deadlock
+        showSuccess('The graph has a cycle, but spare resource instances let every process finish');
+    } else if (result.has_deadlock) {
         // Highlight deadlock cycle
         const cycles = result.cycles;
         const cycleStr = cycles.map(cycle => cycle.join(' → ')).join('\n');
@@ -226,13 +232,14 @@ async function detectDeadlock() {
         status.innerHTML = `
             <div class="bg-red-600 text-white p-4 rounded-lg">
                 <h4 class="font-bold text-lg mb-2">Deadlock Detected!</h4>
+                <p class="mb-2">Deadlocked processes: ${result.deadlocked_processes.map(pid => `P${pid}`).join(', ')}</p>
                 <p class="font-mono">${cycleStr}</p>
             </div>
         `;
         status.classList.remove('hidden');
 
         // Highlight deadlocked nodes and edges
-        const deadlockedNodes = new Set(cycles.flat());
+        const deadlockedNodes = new Set(result.deadlocked);
         data.nodes.forEach(node => {
             if (deadlockedNodes.has(node.id)) {
                 data.nodes.update({
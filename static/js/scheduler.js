@@ -31,6 +31,9 @@ let timeQuantum = 2;
 const PIXELS_PER_TIME_UNIT = 40;
 const MAX_TIME_UNITS_VISIBLE = 20;
 const SIMULATION_DELAY = 300; // Fixed 300ms delay for moderate speed
+const MAX_ANIMATED_SLICES = 200; // Larger schedules are drawn without animation
+const MAX_DOM_SLICES = 2000; // Larger schedules are shown as one server-rendered image
+const QUANTUM_ALGORITHMS = ['rr', 'mlfq'];
 
 // Process color mapping
 const PROCESS_COLORS = {
@@ -48,12 +51,13 @@ const PROCESS_COLORS = {
 
 // Track used process colors
 let usedProcessColors = new Map();
+let ganttImageUrl = null;
 
 // Event Listeners
 document.getElementById('algorithm').addEventListener('change', function(e) {
     selectedAlgorithm = e.target.value;
     const timeQuantumContainer = document.getElementById('timeQuantumContainer');
-    timeQuantumContainer.style.display = selectedAlgorithm === 'rr' ? 'block' : 'none';
+    timeQuantumContainer.style.display = QUANTUM_ALGORITHMS.includes(selectedAlgorithm) ? 'block' : 'none';
 });
 
 // Add process to the queue
@@ -107,36 +111,54 @@ function updateProcessTable() {
 }
 
 // Start simulation
-function startSimulation() {
+async function startSimulation() {
     if (processes.length === 0) {
         alert('Please add processes before starting simulation');
         return;
     }
+    if (isSimulationRunning) {
+        return;
+    }
 
-    if (selectedAlgorithm === 'rr') {
+    if (QUANTUM_ALGORITHMS.includes(selectedAlgorithm)) {
         timeQuantum = parseInt(document.getElementById('timeQuantum').value) || 2;
     }
 
     isSimulationRunning = true;
     currentTime = 0;
     resetProcesses();
+    clearGanttChart();
 
-    // Sort processes by arrival time
-    processes.sort((a, b) => a.arrivalTime - b.arrivalTime);
-
-    switch (selectedAlgorithm) {
-        case 'fcfs':
-            runFCFS();
-            break;
-        case 'sjf':
-            runSJF();
-            break;
-        case 'priority':
-            runPriority();
-            break;
-        case 'rr':
-            runRoundRobin();
-            break;
+    const request = {
+        algorithm: selectedAlgorithm,
+        quantum: timeQuantum,
+        processes: processes.map(p => ({
+            pid: p.name,
+            arrival: p.arrivalTime,
+            burst: p.burstTime,
+            priority: p.priority
+        }))
+    };
+
+    try {
+        const response = await fetch('/api/schedule', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(request)
+        });
+        const result = await response.json();
+        if (result.status !== 'success') {
+            alert(result.message || 'Failed to run simulation');
+            isSimulationRunning = false;
+            return;
+        }
+        animateSchedule(result.schedule, result.stats, request);
+    } catch (error) {
+        console.error('API Error:', error);
+        alert('An error occurred while communicating with the server');
+        isSimulationRunning = false;
     }
 }
 
@@ -161,189 +183,99 @@ function resetProcesses() {
     updateProcessTable();
 }
 
-// FCFS Algorithm
-function runFCFS() {
-    let currentIndex = 0;
-    
-    function executeNextProcess() {
-        if (currentIndex >= processes.length) {
-            finishSimulation();
-            return;
-        }
+// Play back a schedule computed by the server. The schedule is columnar:
+// slice i runs pids[proc[i]] (or proc[i] when pids is null) from start[i]
+// to end[i]. request is the /api/schedule body, used to fetch the chart as
+// an image when the schedule is too large to lay out slice by slice.
+function animateSchedule(schedule, stats, request) {
+    const byName = new Map(processes.map(p => [p.name, p]));
+    const count = schedule.start.length;
+    const pidAt = idx => schedule.pids ? schedule.pids[schedule.proc[idx]] : schedule.proc[idx];
+    const lastSlice = new Map();
+    for (let idx = 0; idx < count; idx++) {
+        lastSlice.set(pidAt(idx), idx);
+    }
 
-        const process = processes[currentIndex];
-        
-        if (currentTime < process.arrivalTime) {
-            currentTime = process.arrivalTime;
+    function applySlice(idx, draw = true) {
+        const pid = pidAt(idx);
+        const start = schedule.start[idx];
+        const end = schedule.end[idx];
+        const process = byName.get(pid);
+        if (process.startTime === null) {
+            process.startTime = start;
         }
-
-        process.startTime = currentTime;
         process.status = 'Running';
-        updateProcessTable();
-        updateGanttChart(process);
-
-        setTimeout(() => {
-            currentTime += process.burstTime;
-            process.finishTime = currentTime;
+        if (draw) {
+            addGanttBlock(process, start, end);
+        }
+        currentTime = end;
+        if (lastSlice.get(pid) === idx) {
+            process.finishTime = end;
             process.status = 'Completed';
-            currentIndex++;
-            updateProcessTable();
-            executeNextProcess();
-        }, SIMULATION_DELAY);
-    }
-
-    executeNextProcess();
-}
-
-// SJF Algorithm
-function runSJF() {
-    function getNextProcess() {
-        return processes
-            .filter(p => p.arrivalTime <= currentTime && p.remainingTime > 0)
-            .sort((a, b) => a.remainingTime - b.remainingTime)[0];
-    }
-
-    function executeNextProcess() {
-        const process = getNextProcess();
-        
-        if (!process) {
-            if (processes.every(p => p.remainingTime === 0)) {
-                finishSimulation();
-                return;
-            }
-            currentTime++;
-            setTimeout(executeNextProcess, SIMULATION_DELAY);
-            return;
         }
+    }
 
-        if (process.startTime === null) {
-            process.startTime = currentTime;
+    if (count > MAX_DOM_SLICES) {
+        for (let idx = 0; idx < count; idx++) {
+            applySlice(idx, false);
         }
-        
-        process.status = 'Running';
         updateProcessTable();
-        updateGanttChart(process);
-
-        setTimeout(() => {
-            process.remainingTime--;
-            currentTime++;
-            
-            if (process.remainingTime === 0) {
-                process.finishTime = currentTime;
-                process.status = 'Completed';
-            }
-            
-            updateProcessTable();
-            executeNextProcess();
-        }, SIMULATION_DELAY);
+        showGanttImage(request).finally(() => finishSimulation(stats));
+        return;
     }
 
-    executeNextProcess();
-}
-
-// Priority Algorithm
-function runPriority() {
-    function getNextProcess() {
-        return processes
-            .filter(p => p.arrivalTime <= currentTime && p.remainingTime > 0)
-            .sort((a, b) => b.priority - a.priority)[0];
+    // Large schedules are drawn in one pass instead of slice by slice
+    if (count > MAX_ANIMATED_SLICES) {
+        for (let idx = 0; idx < count; idx++) {
+            applySlice(idx);
+        }
+        updateTimeAxis(currentTime);
+        updateProcessTable();
+        finishSimulation(stats);
+        return;
     }
 
-    function executeNextProcess() {
-        const process = getNextProcess();
-        
-        if (!process) {
-            if (processes.every(p => p.remainingTime === 0)) {
-                finishSimulation();
-                return;
-            }
-            currentTime++;
-            setTimeout(executeNextProcess, SIMULATION_DELAY);
+    let idx = 0;
+    function step() {
+        if (idx >= count) {
+            updateProcessTable();
+            finishSimulation(stats);
             return;
         }
-
-        if (process.startTime === null) {
-            process.startTime = currentTime;
-        }
-        
-        process.status = 'Running';
+        applySlice(idx);
+        updateTimeAxis(currentTime);
         updateProcessTable();
-        updateGanttChart(process);
-
-        setTimeout(() => {
-            process.remainingTime--;
-            currentTime++;
-            
-            if (process.remainingTime === 0) {
-                process.finishTime = currentTime;
-                process.status = 'Completed';
-            }
-            
-            updateProcessTable();
-            executeNextProcess();
-        }, SIMULATION_DELAY);
+        idx++;
+        setTimeout(step, SIMULATION_DELAY);
     }
 
-    executeNextProcess();
+    step();
 }
 
-// Round Robin Algorithm
-function runRoundRobin() {
-    let queue = [];
-    let timeSlice = 0;
-
-    function updateQueue() {
-        processes
-            .filter(p => p.arrivalTime <= currentTime && p.remainingTime > 0 && !queue.includes(p))
-            .forEach(p => queue.push(p));
-    }
-
-    function executeNextProcess() {
-        updateQueue();
-
-        if (queue.length === 0) {
-            if (processes.every(p => p.remainingTime === 0)) {
-                finishSimulation();
-                return;
-            }
-            currentTime++;
-            setTimeout(executeNextProcess, SIMULATION_DELAY);
-            return;
-        }
-
-        const process = queue.shift();
-        
-        if (process.startTime === null) {
-            process.startTime = currentTime;
+// Replace the DOM chart with one image rendered (and cached) by the server
+async function showGanttImage(request) {
+    const ganttChart = document.getElementById('ganttChart');
+    const container = ganttChart.parentElement.parentElement;
+    try {
+        const response = await fetch('/api/schedule/image', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ ...request, format: 'png', width: container.clientWidth, height: 300 })
+        });
+        if (!response.ok || !response.headers.get('Content-Type').startsWith('image/')) {
+            throw new Error('Failed to render the Gantt chart');
         }
-        
-        process.status = 'Running';
-        updateProcessTable();
-        updateGanttChart(process);
-
-        setTimeout(() => {
-            process.remainingTime--;
-            currentTime++;
-            timeSlice++;
-            
-            if (process.remainingTime === 0) {
-                process.finishTime = currentTime;
-                process.status = 'Completed';
-                timeSlice = 0;
-            } else if (timeSlice === timeQuantum) {
-                queue.push(process);
-                process.status = 'Waiting';
-                timeSlice = 0;
-            } else {
-                queue.unshift(process);
-            }
-            
-            updateProcessTable();
-            executeNextProcess();
-        }, SIMULATION_DELAY);
+        ganttImageUrl = URL.createObjectURL(await response.blob());
+        const image = document.createElement('img');
+        image.src = ganttImageUrl;
+        image.alt = 'Gantt chart';
+        ganttChart.appendChild(image);
+    } catch (error) {
+        console.error('API Error:', error);
+        alert('An error occurred while rendering the Gantt chart');
     }
-
-    executeNextProcess();
 }
 
 // Update time axis with more detailed markers
@@ -395,17 +327,18 @@ function updateProcessLegend() {
     }
 }
 
-// Update Gantt Chart
-function updateGanttChart(process) {
+// Add a block for one schedule slice to the Gantt chart
+function addGanttBlock(process, startTime, endTime) {
     const ganttChart = document.getElementById('ganttChart');
+    const previousEnd = parseInt(ganttChart.dataset.maxTime || 0);
     
     // Handle idle time
-    if (process.arrivalTime > currentTime) {
+    if (startTime > previousEnd) {
         const idleBlock = document.createElement('div');
         idleBlock.className = 'process-block idle-block';
-        const idleWidth = (process.arrivalTime - currentTime) * PIXELS_PER_TIME_UNIT;
+        const idleWidth = (startTime - previousEnd) * PIXELS_PER_TIME_UNIT;
         idleBlock.style.width = `${idleWidth}px`;
-        idleBlock.style.left = `${currentTime * PIXELS_PER_TIME_UNIT}px`;
+        idleBlock.style.left = `${previousEnd * PIXELS_PER_TIME_UNIT}px`;
         idleBlock.innerHTML = `
             <span class="process-name">Idle</span>
         `;
@@ -417,17 +350,7 @@ function updateGanttChart(process) {
     const colorClass = getProcessColorClass(process.name);
     processBlock.className = `process-block ${colorClass}`;
     
-    // Calculate time span and position
-    let timeSpan;
-    if (selectedAlgorithm === 'fcfs') {
-        timeSpan = process.burstTime;
-    } else {
-        timeSpan = 1; // For other algorithms that execute one time unit at a time
-    }
-    
-    const startTime = Math.max(currentTime, process.arrivalTime);
-    const endTime = startTime + timeSpan;
-    const width = timeSpan * PIXELS_PER_TIME_UNIT;
+    const width = (endTime - startTime) * PIXELS_PER_TIME_UNIT;
     
     processBlock.style.width = `${width}px`;
     processBlock.style.left = `${startTime * PIXELS_PER_TIME_UNIT}px`;
@@ -440,10 +363,7 @@ function updateGanttChart(process) {
     processBlock.title = `Process ${process.name} (${startTime} → ${endTime})`;
     
     ganttChart.appendChild(processBlock);
-    
-    // Update time axis if needed
-    updateTimeAxis(Math.max(endTime, ganttChart.dataset.maxTime || 0));
-    ganttChart.dataset.maxTime = Math.max(endTime, ganttChart.dataset.maxTime || 0);
+    ganttChart.dataset.maxTime = Math.max(endTime, previousEnd);
     
     // Scroll to keep current time visible
     const container = ganttChart.parentElement.parentElement;
@@ -463,27 +383,26 @@ function clearGanttChart() {
     legend.innerHTML = '';
     ganttChart.dataset.maxTime = '0';
     usedProcessColors.clear();
+    if (ganttImageUrl) {
+        URL.revokeObjectURL(ganttImageUrl);
+        ganttImageUrl = null;
+    }
 }
 
 // Update Statistics
-function updateStatistics() {
-    const completedProcesses = processes.filter(p => p.status === 'Completed');
-    
-    if (completedProcesses.length === 0) {
+function updateStatistics(stats = null) {
+    if (!stats) {
         document.getElementById('avgWaitingTime').textContent = '0.00';
         document.getElementById('avgTurnaroundTime').textContent = '0.00';
         return;
     }
 
-    const avgWaitingTime = completedProcesses.reduce((sum, p) => sum + p.waitingTime, 0) / completedProcesses.length;
-    const avgTurnaroundTime = completedProcesses.reduce((sum, p) => sum + p.turnaroundTime, 0) / completedProcesses.length;
-
-    document.getElementById('avgWaitingTime').textContent = avgWaitingTime.toFixed(2);
-    document.getElementById('avgTurnaroundTime').textContent = avgTurnaroundTime.toFixed(2);
+    document.getElementById('avgWaitingTime').textContent = stats.avg_wt.toFixed(2);
+    document.getElementById('avgTurnaroundTime').textContent = stats.avg_tat.toFixed(2);
 }
 
 // Finish simulation
-function finishSimulation() {
+function finishSimulation(stats) {
     isSimulationRunning = false;
-    updateStatistics();
-} 
\ No newline at end of file
+    updateStatistics(stats);
+} 
@@ -0,0 +1,182 @@
+import math
+
+# Streaming statistics for scheduler runs. A StatsCollector is fed each
+# slice as the algorithm emits it; per-process state is dropped as soon as
+# the process completes and percentiles come from fixed-size histograms, so
+# memory stays bounded by the number of live processes. numpy is only
+# imported by the array methods, whose callers already have it loaded.
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    # Values below 1024 get their own bucket, larger values share buckets
+    # 1/512 of their magnitude wide (log-linear, like HdrHistogram).
+    SUB_BITS = 10
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        value = max(int(value), 0)
+        if value >> self.SUB_BITS:
+            shift = value.bit_length() - self.SUB_BITS
+            code = (shift << self.SUB_BITS) + (value >> shift)
+        else:
+            code = value
+        self.counts[code] = self.counts.get(code, 0) + 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        import numpy as np
+
+        values = np.asarray(values, dtype=np.int64)
+        if not len(values):
+            return
+        # Small values are their own code: clipping to 1 << SUB_BITS counts
+        # them in one bincount, with every larger value in the last slot,
+        # and only those go through the log-linear bucketing
+        limit = 1 << self.SUB_BITS
+        counts = np.bincount(np.clip(values, 0, limit), minlength=limit + 1)
+        n_large = int(counts[limit])
+        parts = [counts[:limit]]
+        if n_large:
+            large = values[values >= limit]
+            # frexp's exponent is the bit length for integers below 2**53
+            _, bits = np.frexp(large.astype(np.float64))
+            shift = bits - self.SUB_BITS
+            parts.append(np.bincount((shift << self.SUB_BITS) + (large >> shift)))
+            top = int(large.max())
+        else:
+            top = int(np.flatnonzero(counts)[-1])
+        for part in parts:
+            for code in np.flatnonzero(part).tolist():
+                self.counts[code] = self.counts.get(code, 0) + int(part[code])
+        self.total += len(values)
+        self.max = max(self.max, top)
+
+    def merge(self, other):
+        for code, count in other.counts.items():
+            self.counts[code] = self.counts.get(code, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def _bucket_value(self, code):
+        shift = code >> self.SUB_BITS
+        low = (code & ((1 << self.SUB_BITS) - 1)) << shift
+        return min(low + ((1 << shift) >> 1), self.max)
+
+    def percentile(self, q):
+        if not self.total:
+            return 0
+        rank = max(math.ceil(q / 100 * self.total), 1)
+        seen = 0
+        for code in sorted(self.counts):
+            seen += self.counts[code]
+            if seen >= rank:
+                return self._bucket_value(code)
+        return self.max
+
+
+class StatsCollector:
+    def __init__(self):
+        self.live = {}  # key: [arrival, burst, remaining, first_start]
+        self.completed = 0
+        self.sum_wt = 0
+        self.sum_tat = 0
+        self.sum_rt = 0
+        self.hist_wt = Histogram()
+        self.hist_tat = Histogram()
+        self.hist_rt = Histogram()
+        self.busy_time = 0
+        self.slices = 0
+        self.context_switches = 0
+        self.first_arrival = None
+        self.last_end = 0
+        self.last_key = None
+
+    def add_process(self, key, arrival, burst):
+        self.live[key] = [arrival, burst, burst, None]
+        if self.first_arrival is None or arrival < self.first_arrival:
+            self.first_arrival = arrival
+
+    def add_slice(self, key, start, end):
+        state = self.live[key]
+        if state[3] is None:
+            state[3] = start
+            response = start - state[0]
+            self.sum_rt += response
+            self.hist_rt.add(response)
+        if self.slices and key != self.last_key:
+            self.context_switches += 1
+        self.slices += 1
+        self.last_key = key
+        self.busy_time += end - start
+        self.last_end = max(self.last_end, end)
+        state[2] -= end - start
+        if state[2] <= 0:
+            del self.live[key]
+            self.add_completion(state[0], state[1], end)
+
+    def add_batch(self, arrival, burst, start, finish):
+        # Array form of add_process + add_slice for processes that each run
+        # as one slice, in order, as in a vectorized non-preemptive schedule
+        n = len(arrival)
+        if not n:
+            return
+        # With one slice each, response time is the waiting time, so both
+        # histograms take the same counts
+        waiting = start - arrival
+        sum_wt = int(waiting.sum())
+        busy = int(burst.sum())
+        self.completed += n
+        self.sum_wt += sum_wt
+        self.sum_rt += sum_wt
+        self.sum_tat += sum_wt + busy
+        batch = Histogram()
+        batch.add_many(waiting)
+        self.hist_wt.merge(batch)
+        self.hist_rt.merge(batch)
+        self.hist_tat.add_many(finish - arrival)
+        self.context_switches += n if self.slices else n - 1
+        self.slices += n
+        self.last_key = None
+        self.busy_time += busy
+        self.last_end = max(self.last_end, int(finish.max()))
+        first = int(arrival.min())
+        if self.first_arrival is None or first < self.first_arrival:
+            self.first_arrival = first
+
+    def add_completion(self, arrival, burst, finish):
+        turnaround = finish - arrival
+        waiting = turnaround - burst
+        self.completed += 1
+        self.sum_tat += turnaround
+        self.sum_wt += waiting
+        self.hist_tat.add(turnaround)
+        self.hist_wt.add(waiting)
+
+    def result(self):
+        n = self.completed
+        makespan = self.last_end - (self.first_arrival or 0)
+        stats = {
+            'avg_wt': self.sum_wt / n if n else 0,
+            'avg_tat': self.sum_tat / n if n else 0,
+            'avg_rt': self.sum_rt / self.hist_rt.total if self.hist_rt.total else 0,
+        }
+        for name, hist in (('wt', self.hist_wt), ('tat', self.hist_tat), ('rt', self.hist_rt)):
+            for q in PERCENTILES:
+                stats[f'p{q}_{name}'] = hist.percentile(q)
+        stats.update({
+            'completed': n,
+            'makespan': makespan,
+            'throughput': n / makespan if makespan else 0,
+            'cpu_utilization': self.busy_time / makespan if makespan else 0,
+            'context_switches': self.context_switches,
+            'slices': self.slices,
+        })
+        return stats
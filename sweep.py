@@ -0,0 +1,115 @@
+import os
+
+import scheduling
+from stats import PERCENTILES
+
+# Runs every algorithm (and every quantum for the quantum-based ones) on the
+# same workload and ranks them by a measured objective.
+
+DEFAULT_QUANTA = (1, 2, 4, 8, 16)
+QUANTUM_ALGORITHMS = ("Round Robin", "Multilevel Feedback Queue")
+
+# Objective name: True if larger is better
+OBJECTIVES = {
+    'avg_wt': False,
+    'avg_tat': False,
+    'avg_rt': False,
+    'makespan': False,
+    'context_switches': False,
+    'throughput': True,
+    'cpu_utilization': True,
+}
+for _name in ('wt', 'tat', 'rt'):
+    for _q in PERCENTILES:
+        OBJECTIVES[f'p{_q}_{_name}'] = False
+
+# Below this many process-runs the pool startup costs more than it saves
+PARALLEL_THRESHOLD = 20000
+
+
+def make_tasks(algorithms, quanta):
+    # (algorithm, quantum) pairs: every quantum for the quantum-based
+    # algorithms, the first one for the rest (which ignore it)
+    tasks = []
+    for algo in algorithms:
+        algo = scheduling.ALIASES.get(algo, algo)
+        for quantum in (quanta if algo in QUANTUM_ALGORITHMS else quanta[:1]):
+            tasks.append((algo, quantum))
+    return tasks
+
+
+_worker_workload = None
+
+
+def _init_worker(workload):
+    # Ship the workload once per worker instead of once per task
+    global _worker_workload
+    _worker_workload = workload
+
+
+def _run(task, workload=None, progress=None):
+    algo, quantum = task
+    workload = _worker_workload if workload is None else workload
+    if isinstance(workload, str):
+        import traces
+        return traces.replay(workload, algo, quantum, progress=progress)
+    _, stats = scheduling.run_algorithm(algo, workload, quantum, keep_schedule=False, progress=progress)
+    return stats
+
+
+def run_tasks(workload, tasks, jobs=1, progress=None):
+    # One stats row per task, in task order. workload is a list of process
+    # dicts, a ProcessTable or the path of a trace file to stream. progress,
+    # if given, is called with runs_done and runs after every run (and
+    # passed on to in-process runs); it may raise to stop the remaining runs.
+    parallel = jobs > 1 and len(tasks) > 1 and (
+        isinstance(workload, str) or len(workload) * len(tasks) >= PARALLEL_THRESHOLD)
+    all_stats = []
+    if parallel:
+        # Imported here so importing sweep for OBJECTIVES stays cheap
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Never fork: callers run on Flask and job threads, and a child
+        # forked while another thread holds a lock (metrics, the graph
+        # store, the result cache, logging) would inherit it held forever
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_worker, initargs=(workload,)) as pool:
+            try:
+                for stats in pool.map(_run, tasks):
+                    all_stats.append(stats)
+                    if progress:
+                        progress(runs_done=len(all_stats), runs=len(tasks))
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+    else:
+        for task in tasks:
+            all_stats.append(_run(task, workload, progress))
+            if progress:
+                progress(runs_done=len(all_stats), runs=len(tasks))
+
+    rows = []
+    for (algo, quantum), stats in zip(tasks, all_stats):
+        row = {'algorithm': algo, 'quantum': quantum if algo in QUANTUM_ALGORITHMS else None}
+        row.update(stats)
+        rows.append(row)
+    return rows
+
+
+def rank(rows, objective):
+    # Sorts rows in place, best first by objective, and returns them
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    larger_is_better = OBJECTIVES[objective]
+    rows.sort(key=lambda row: -row[objective] if larger_is_better else row[objective])
+    return rows
+
+
+def sweep(procs, quanta=DEFAULT_QUANTA, objective='avg_wt', jobs=None, progress=None):
+    # progress is as for run_tasks
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    quanta = sorted({int(q) for q in quanta if int(q) > 0}) or list(DEFAULT_QUANTA)
+    rows = run_tasks(procs, make_tasks(scheduling.ALGORITHMS, quanta), jobs or os.cpu_count() or 1, progress)
+    return rank(rows, objective)
@@ -0,0 +1,40 @@
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+PROCESSES = [{'pid': 1, 'arrival': 0, 'burst': 3}, {'pid': 2, 'arrival': 1, 'burst': 2}]
+
+
+@pytest.mark.parametrize('quantum', [0, '0', -1, 'abc'])
+def test_schedule_rejects_a_bad_quantum(client, quantum):
+    response = client.post('/api/schedule', json={'algorithm': 'rr', 'processes': PROCESSES, 'quantum': quantum})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+@pytest.mark.parametrize('quantum', [None, ''])
+def test_schedule_defaults_a_missing_quantum(client, quantum):
+    response = client.post('/api/schedule', json={'algorithm': 'rr', 'processes': PROCESSES, 'quantum': quantum})
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+
+
+def test_detect_deadlock_answers_304_until_the_graph_changes(client):
+    first = client.get('/api/detect_deadlock')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    again = client.get('/api/detect_deadlock', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert not again.data
+    client.post('/api/resource', json={'rid': 'a', 'instances': 1})
+    changed = client.get('/api/detect_deadlock', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['has_deadlock'] is False
@@ -0,0 +1,64 @@
+import copy
+import itertools
+import random
+
+from resource_graph import ResourceAllocationGraph
+
+
+def finishes_in_order(rag, order):
+    work = {rid: rag.available(rid) for rid in rag.resources}
+    for pid in order:
+        if any(rag.need(pid, rid) > work[rid] for rid in rag.resources):
+            return False
+        for rid in rag.resources:
+            work[rid] += rag.allocation.get((pid, rid), 0)
+    return True
+
+
+def brute_force_safe(rag):
+    return any(finishes_in_order(rag, order) for order in itertools.permutations(rag.processes))
+
+
+def random_state(rng):
+    rag = ResourceAllocationGraph()
+    for rid in range(rng.randint(1, 3)):
+        rag.add_resource(rid, rng.randint(1, 5))
+    for pid in range(rng.randint(1, 5)):
+        rag.add_process(pid)
+        for rid, total in rag.resources.items():
+            rag.set_max_claim(pid, rid, rng.randint(0, total))
+    return rag
+
+
+def test_safe_sequence_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(300):
+        rag = random_state(rng)
+        for _ in range(8):
+            pid, rid = rng.choice(sorted(rag.processes)), rng.choice(list(rag.resources))
+            held = rag.allocation.get((pid, rid), 0)
+            rag.allocate(pid, rid, held + rng.randint(1, 2))
+            sequence = rag.safe_sequence()
+            if sequence is None:
+                assert not brute_force_safe(rag)
+            else:
+                assert sorted(sequence) == sorted(rag.processes)
+                assert finishes_in_order(rag, sequence)
+
+
+def test_grant_only_when_the_result_stays_safe():
+    rng = random.Random(1)
+    for _ in range(300):
+        rag = random_state(rng)
+        for _ in range(10):
+            pid, rid, instances = rng.choice(sorted(rag.processes)), rng.choice(list(rag.resources)), rng.randint(1, 3)
+            expected = False
+            if 0 < instances <= min(rag.need(pid, rid), rag.available(rid)) and brute_force_safe(rag):
+                trial = copy.deepcopy(rag)
+                trial.allocate(pid, rid, trial.allocation.get((pid, rid), 0) + instances)
+                expected = brute_force_safe(trial)
+            before = dict(rag.allocation)
+            assert rag.can_grant(pid, rid, instances) == expected
+            assert rag.allocation == before
+            assert rag.grant(pid, rid, instances) == expected
+            assert finishes_in_order(rag, rag.safe_sequence())
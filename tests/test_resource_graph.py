@@ -0,0 +1,62 @@
+import random
+
+import networkx as nx
+import pytest
+
+import resource_graph
+from resource_graph import ResourceAllocationGraph
+
+
+def random_operation(rng, pids, rids):
+    pid, rid = rng.choice(pids), rng.choice(rids)
+    name = rng.choice(('allocate', 'allocate', 'request', 'request', 'release'))
+    if name == 'release':
+        return name, (pid, rid)
+    return name, (pid, rid, rng.randint(1, 2))
+
+
+def assert_matches_brute_force(rag):
+    # An edge u -> v is on a cycle exactly when v reaches u
+    graph = rag.graph
+    for u, v in graph.edges():
+        assert rag.closes_cycle(u, v) == nx.has_path(graph, v, u), (u, v)
+    assert rag.has_deadlock() == (not nx.is_directed_acyclic_graph(graph))
+
+
+@pytest.mark.parametrize('reorder_limit', [2, resource_graph.REORDER_LIMIT])
+def test_cycle_tracking_matches_brute_force(monkeypatch, reorder_limit):
+    # A small limit sends most inserts down the rebuild path
+    monkeypatch.setattr(resource_graph, 'REORDER_LIMIT', reorder_limit)
+    rng = random.Random(reorder_limit)
+    for _ in range(60):
+        pids = list(range(1, rng.randint(2, 8)))
+        rids = [f"r{i}" for i in range(rng.randint(1, 6))]
+        rag = ResourceAllocationGraph()
+        for rid in rids:
+            rag.add_resource(rid, rng.randint(1, 3))
+        for _ in range(40):
+            choice = rng.random()
+            if choice < 0.1:
+                rag.apply_batch([random_operation(rng, pids, rids) for _ in range(rng.randint(1, 5))])
+            elif choice < 0.15:
+                rag = ResourceAllocationGraph.from_snapshot(rag.snapshot())
+            else:
+                name, args = random_operation(rng, pids, rids)
+                getattr(rag, name)(*args)
+            assert_matches_brute_force(rag)
+
+
+def test_closes_cycle_on_a_two_process_deadlock():
+    rag = ResourceAllocationGraph()
+    rag.add_resource('a', 1)
+    rag.add_resource('b', 1)
+    rag.allocate(1, 'a', 1)
+    rag.allocate(2, 'b', 1)
+    rag.request(1, 'b', 1)
+    assert not rag.has_deadlock()
+    rag.request(2, 'a', 1)
+    assert rag.closes_cycle('P2', 'Ra')
+    assert rag.has_deadlock()
+    rag.release(1, 'a')
+    assert not rag.closes_cycle('P2', 'Ra')
+    assert not rag.has_deadlock()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import scheduling
+from schedule_table import Schedule
+
+# Reference versions of the algorithms SchedulerApp ran before the engine
+# was extracted: a unit-step clock and list scans, returning the slices and
+# per-pid waiting, turnaround and response times.
+
+
+def baseline_non_preemptive(procs, key):
+    procs = sorted(procs, key=lambda p: p['arrival'])
+    ready, slices, times = [], [], {}
+    time = 0
+    while procs or ready:
+        ready += [p for p in procs if p['arrival'] <= time]
+        procs = [p for p in procs if p['arrival'] > time]
+        if not ready:
+            time += 1
+            continue
+        p = min(ready, key=key)
+        ready.remove(p)
+        slices.append({'pid': p['pid'], 'start': time, 'end': time + p['burst']})
+        times[p['pid']] = (time - p['arrival'], time + p['burst'] - p['arrival'], time - p['arrival'])
+        time += p['burst']
+    return slices, times
+
+
+def baseline_rr(procs, quantum):
+    left = [dict(p, remaining=p['burst']) for p in procs]
+    ready, slices, times, first = [], [], {}, {}
+    time = 0
+    while left or ready:
+        ready += [p for p in left if p['arrival'] <= time]
+        left = [p for p in left if p['arrival'] > time]
+        if not ready:
+            time += 1
+            continue
+        p = ready.pop(0)
+        first.setdefault(p['pid'], time - p['arrival'])
+        run = min(p['remaining'], quantum)
+        slices.append({'pid': p['pid'], 'start': time, 'end': time + run})
+        time += run
+        p['remaining'] -= run
+        if p['remaining']:
+            ready.append(p)
+        else:
+            tat = time - p['arrival']
+            times[p['pid']] = (tat - p['burst'], tat, first[p['pid']])
+    return slices, times
+
+
+BASELINES = {
+    'fcfs': lambda procs, quantum: baseline_non_preemptive(procs, lambda p: 0),
+    'sjf': lambda procs, quantum: baseline_non_preemptive(procs, lambda p: p['burst']),
+    'priority': lambda procs, quantum: baseline_non_preemptive(procs, lambda p: p['priority']),
+    'rr': baseline_rr,
+}
+
+
+def random_workloads(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        procs = [
+            {'pid': i + 1, 'arrival': rng.randint(0, 15), 'burst': rng.randint(1, 8), 'priority': rng.randint(1, 4)}
+            for i in range(rng.randint(1, 12))
+        ]
+        rng.shuffle(procs)
+        yield procs, rng.randint(1, 4)
+
+
+@pytest.mark.parametrize('algo', list(BASELINES))
+def test_engine_matches_the_baseline_algorithms(algo):
+    for procs, quantum in random_workloads(500, seed=len(algo)):
+        slices, times = BASELINES[algo](procs, quantum)
+        schedule, stats = scheduling.run_algorithm(algo, procs, quantum)
+        assert schedule.to_dicts() == Schedule.from_dicts(slices).to_dicts(), (procs, quantum)
+        for i, name in enumerate(('avg_wt', 'avg_tat', 'avg_rt')):
+            expected = sum(t[i] for t in times.values()) / len(times)
+            assert stats[name] == pytest.approx(expected), (procs, quantum, name)
+
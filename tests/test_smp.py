@@ -0,0 +1,58 @@
+import heapq
+import random
+
+import pytest
+
+import process_table
+import scheduling
+import smp
+
+
+def random_workloads(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        procs = [
+            {'pid': i + 1, 'arrival': rng.randint(0, 15), 'burst': rng.randint(1, 8), 'priority': rng.randint(1, 5)}
+            for i in range(rng.randint(1, 12))
+        ]
+        yield procs, rng.randint(1, 4)
+
+
+@pytest.mark.parametrize('balancer', smp.BALANCERS)
+@pytest.mark.parametrize('algo', list(smp.POLICIES))
+def test_one_core_matches_single_cpu_engine(algo, balancer):
+    for procs, quantum in random_workloads(300, seed=len(algo)):
+        schedule, stats = scheduling.run_algorithm(algo, procs, quantum)
+        schedules, smp_stats = smp.simulate(algo, procs, cores=1, balancer=balancer, quantum=quantum)
+        assert schedules[0].to_json() == schedule.to_json(), (procs, quantum)
+        assert {key: smp_stats[key] for key in stats} == stats, (procs, quantum)
+
+
+def test_one_core_matches_on_a_process_table():
+    table = process_table.ProcessTable.from_dicts(next(random_workloads(1, seed=1))[0])
+    for algo in smp.POLICIES:
+        _, stats = scheduling.run_algorithm(algo, table, 3, keep_schedule=False)
+        _, smp_stats = smp.simulate(algo, table, cores=1, quantum=3, keep_schedule=False)
+        assert {key: smp_stats[key] for key in stats} == stats
+
+
+@pytest.mark.parametrize('balancer', smp.BALANCERS)
+def test_every_process_runs_to_completion_on_many_cores(balancer):
+    for procs, quantum in random_workloads(100, seed=2):
+        schedules, stats = smp.simulate('rr', procs, cores=3, balancer=balancer, quantum=quantum)
+        ran = {}
+        for schedule in schedules:
+            data = schedule.to_json()
+            for proc, start, end in zip(data['proc'], data['start'], data['end']):
+                pid = data['pids'][proc]
+                ran[pid] = ran.get(pid, 0) + end - start
+        assert ran == {p['pid']: p['burst'] for p in procs}
+        assert sum(core['busy_time'] for core in stats['per_core']) == sum(p['burst'] for p in procs)
+
+
+def test_migrations_take_the_least_urgent_entry():
+    queue = [((key, 0), key, None) for key in (5, 1, 9, 3, 7)]
+    heapq.heapify(queue)
+    assert smp._pop_least_urgent(queue)[1] == 9
+    assert sorted(entry[1] for entry in queue) == [1, 3, 5, 7]
+    assert queue[0][1] == 1
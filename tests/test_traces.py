@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import scheduling
+import traces
+from process_table import ProcessTable
+
+
+def random_table(seed, count=200):
+    rng = random.Random(seed)
+    arrivals = sorted(rng.randint(0, 400) for _ in range(count))
+    return ProcessTable(
+        range(1, count + 1), arrivals, [rng.randint(1, 9) for _ in range(count)], [rng.randint(0, 4) for _ in range(count)]
+    )
+
+
+def write_csv(path, table):
+    with open(path, 'w') as f:
+        f.write("pid,arrival,burst,priority\n")
+        for p in table.to_dicts():
+            f.write(f"{p['pid']},{p['arrival']},{p['burst']},{p['priority']}\n")
+
+
+@pytest.fixture(params=['bin', 'csv'])
+def trace(request, tmp_path):
+    table = random_table(seed=len(request.param))
+    path = tmp_path / f"trace.{request.param}"
+    if request.param == 'bin':
+        traces.write_trace(path, [table.take(slice(0, 50)), table.take(slice(50, None))])
+    else:
+        write_csv(path, table)
+    return str(path), table
+
+
+def test_load_returns_what_was_written(trace):
+    path, table = trace
+    assert traces.load_trace(path).to_dicts() == table.to_dicts()
+    assert sum(len(chunk) for chunk in traces.iter_tables(path, chunk_size=7)) == len(table)
+
+
+@pytest.mark.parametrize('algo', list(scheduling.ALGORITHMS))
+def test_replay_matches_scheduling_the_table(trace, algo):
+    path, table = trace
+    _, stats = scheduling.run_algorithm(algo, table.to_dicts(), 3)
+    assert traces.replay(path, algo, 3, chunk_size=16) == stats
+
+
+def test_unsorted_trace_is_rejected(tmp_path):
+    path = tmp_path / "trace.bin"
+    traces.write_trace(path, ProcessTable([1, 2], [5, 1], [1, 1], [0, 0]))
+    with pytest.raises(ValueError):
+        traces.load_trace(str(path))
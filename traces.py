@@ -0,0 +1,153 @@
+import itertools
+import os
+from time import perf_counter
+
+import numpy as np
+
+import metrics
+import scheduling
+from process_table import ProcessTable, fcfs_times
+from stats import StatsCollector
+
+# Workload trace files, read a fixed number of rows at a time so a trace of
+# tens of millions of processes is scheduled in bounded memory without a
+# dict per process. Two formats:
+#   CSV: a header row naming arrival and burst columns, plus optional
+#        priority and pid columns
+#   binary: MAGIC padded to HEADER_SIZE bytes, then little-endian TRACE_DTYPE
+#        records; the file is memory mapped
+# Rows must be sorted by arrival. Binary traces carry no pids and CSV pids
+# are optional; missing pids are the 1-based row number.
+
+MAGIC = b'SCHEDTRC'
+HEADER_SIZE = 16
+TRACE_DTYPE = np.dtype([('arrival', '<i8'), ('burst', '<i4'), ('priority', '<i4')])
+CHUNK_SIZE = 1 << 20
+CSV_COLUMNS = ('pid', 'arrival', 'burst', 'priority')
+
+
+def _records(table):
+    records = np.empty(len(table), dtype=TRACE_DTYPE)
+    records['arrival'] = table.arrival
+    records['burst'] = table.burst
+    records['priority'] = table.priority
+    return records
+
+
+def write_trace(path, tables):
+    # tables is a ProcessTable or an iterable of them, written in order
+    if isinstance(tables, ProcessTable):
+        tables = [tables]
+    with open(path, 'wb') as f:
+        f.write(MAGIC.ljust(HEADER_SIZE, b'\0'))
+        for table in tables:
+            _records(table).tofile(f)
+
+
+def trace_bytes(table):
+    # The binary trace of one table, for sending without a file
+    return MAGIC.ljust(HEADER_SIZE, b'\0') + _records(table).tobytes()
+
+
+def is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def open_binary(path):
+    size = os.path.getsize(path) - HEADER_SIZE
+    if size < 0 or size % TRACE_DTYPE.itemsize:
+        raise ValueError(f"{path}: truncated trace file")
+    if not size:
+        return np.empty(0, dtype=TRACE_DTYPE)
+    return np.memmap(path, dtype=TRACE_DTYPE, mode='r', offset=HEADER_SIZE)
+
+
+def _binary_chunks(path, chunk_size):
+    records = open_binary(path)
+    for lo in range(0, len(records), chunk_size):
+        chunk = records[lo:lo + chunk_size]
+        yield ProcessTable(np.arange(lo + 1, lo + 1 + len(chunk)), chunk['arrival'], chunk['burst'], chunk['priority'])
+
+
+def _csv_chunks(path, chunk_size):
+    with open(path) as f:
+        header = [name.strip().lower() for name in f.readline().split(',')]
+        if 'arrival' not in header or 'burst' not in header:
+            raise ValueError(f"{path}: CSV trace needs arrival and burst columns")
+        names = [name for name in CSV_COLUMNS if name in header]
+        usecols = [header.index(name) for name in names]
+        row = 0
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                break
+            data = np.loadtxt(lines, delimiter=',', dtype=np.int64, usecols=usecols, ndmin=2)
+            columns = dict(zip(names, data.T))
+            n = len(data)
+            yield ProcessTable(
+                columns.get('pid', np.arange(row + 1, row + 1 + n)),
+                columns['arrival'],
+                columns['burst'],
+                columns.get('priority', np.zeros(n, dtype=np.int32)),
+            )
+            row += n
+
+
+def iter_tables(path, chunk_size=CHUNK_SIZE):
+    chunks = _binary_chunks(path, chunk_size) if is_binary(path) else _csv_chunks(path, chunk_size)
+    last_arrival = None
+    for table in chunks:
+        if not len(table):
+            continue
+        if np.any(table.arrival < 0) or np.any(table.burst < 1):
+            raise ValueError(f"{path}: arrival must be non-negative and burst positive")
+        if (last_arrival is not None and table.arrival[0] < last_arrival) or np.any(np.diff(table.arrival) < 0):
+            raise ValueError(f"{path}: trace is not sorted by arrival")
+        last_arrival = table.arrival[-1]
+        yield table
+
+
+def iter_arrivals(path, chunk_size=CHUNK_SIZE):
+    # The (index, pid, arrival, burst, priority) stream scheduling's engines take
+    first_index = 0
+    for table in iter_tables(path, chunk_size):
+        yield from table.iter_arrivals(first_index)
+        first_index += len(table)
+
+
+def load_trace(path):
+    tables = list(iter_tables(path))
+    return ProcessTable(
+        np.concatenate([t.pid for t in tables] or [[]]),
+        np.concatenate([t.arrival for t in tables] or [[]]),
+        np.concatenate([t.burst for t in tables] or [[]]),
+        np.concatenate([t.priority for t in tables] or [[]]),
+    )
+
+
+def replay(path, algo, quantum=2, chunk_size=CHUNK_SIZE, progress=None):
+    # Stats for algo over the whole trace; the schedule itself is not kept.
+    # progress is scheduling.run_algorithm's callback.
+    if quantum < 1:
+        raise ValueError("Quantum must be a positive integer")
+    algo = scheduling.ALIASES.get(algo, algo)
+    if algo not in scheduling.ALGORITHMS:
+        return {}
+    if algo != "First Come First Serve":
+        _, stats = scheduling.run_algorithm(algo, iter_arrivals(path, chunk_size), quantum, keep_schedule=False,
+                                            progress=progress)
+        return stats
+    # FCFS is vectorized chunk by chunk, carrying the CPU's finish time over
+    started = perf_counter()
+    collector = StatsCollector()
+    current_time = 0
+    for table in iter_tables(path, chunk_size):
+        start, finish = fcfs_times(table.arrival, table.burst, current_time)
+        collector.add_batch(table.arrival, table.burst, start, finish)
+        current_time = int(finish[-1])
+        if progress:
+            progress(time=current_time, completed=collector.completed)
+    stats = collector.result()
+    metrics.record_scheduler_run(algo, perf_counter() - started, stats, 2 * stats['completed'])
+    return stats
@@ -0,0 +1,140 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from process_table import ProcessTable
+
+# Seeded synthetic workloads, generated a column at a time with NumPy so
+# ten million processes take about a second. generate() returns a
+# ProcessTable, which every scheduling algorithm accepts as is; use
+# to_dicts() for the Tk app's process list.
+#
+#   python -m workloads 1000000 --arrival mmpp --burst pareto --output w.trace
+#   python -m batch w.trace --jobs 4
+#
+# Arrivals (mean gap mean_burst / load, so load is the offered CPU load):
+#   poisson: exponential gaps
+#   mmpp:    two-state Markov-modulated Poisson; runs of about MMPP_RUN
+#            arrivals alternate between a fast and a slow state whose rates
+#            differ by MMPP_RATIO, with the same overall mean gap
+#   batch:   everything arrives at time 0
+# Bursts (mean about mean_burst):
+#   exponential, pareto (shape PARETO_SHAPE, heavy tailed), uniform, and
+#   bimodal (BIMODAL_SHORT_FRACTION short jobs around a quarter of the mean,
+#   the rest long jobs around four times it)
+# Priorities (1 is most urgent) are drawn from one of PRIORITY_MIXES.
+
+ARRIVALS = ('poisson', 'mmpp', 'batch')
+BURSTS = ('exponential', 'pareto', 'uniform', 'bimodal')
+PRIORITY_LEVELS = (1, 2, 3, 4, 5)
+# Mix name: weight of each of PRIORITY_LEVELS, or None for equal weights
+PRIORITY_MIXES = {
+    'uniform': None,
+    'skewed': (0.05, 0.10, 0.15, 0.30, 0.40),  # few urgent processes, many background ones
+    'flat': (0, 0, 1, 0, 0),  # everything at the middle priority
+}
+MAX_PROCESSES = 50_000_000
+
+MMPP_RATIO = 10
+MMPP_RUN = 100
+PARETO_SHAPE = 1.5
+BIMODAL_SHORT_FRACTION = 0.8
+BIMODAL_SHAPE = 4  # gamma shape of each mode; larger is narrower
+
+
+def _arrivals(rng, n, kind, mean_gap):
+    if kind == 'batch':
+        return np.zeros(n, dtype=np.int64)
+    if kind == 'poisson':
+        gaps = rng.exponential(mean_gap, n)
+    else:
+        # Alternating state runs with geometric lengths, then one gap per
+        # arrival scaled by its state's mean gap
+        runs = rng.geometric(1 / MMPP_RUN, n // MMPP_RUN * 2 + 2)
+        while runs.sum() < n:
+            runs = np.concatenate((runs, rng.geometric(1 / MMPP_RUN, len(runs))))
+        state = np.repeat(np.arange(len(runs)) & 1, runs)[:n]
+        fast = 2 * mean_gap / (1 + MMPP_RATIO)
+        gaps = rng.exponential(1.0, n) * np.where(state, fast * MMPP_RATIO, fast)
+    return np.cumsum(gaps).astype(np.int64)
+
+
+def _bursts(rng, n, kind, mean):
+    if kind == 'exponential':
+        burst = np.ceil(rng.exponential(mean, n))
+    elif kind == 'pareto':
+        burst = np.ceil((rng.pareto(PARETO_SHAPE, n) + 1) * (mean * (PARETO_SHAPE - 1)) / PARETO_SHAPE)
+    elif kind == 'uniform':
+        return rng.integers(1, max(2 * mean, 2), n)
+    else:
+        short = rng.random(n) < BIMODAL_SHORT_FRACTION
+        burst = np.ceil(rng.gamma(BIMODAL_SHAPE, 1.0, n) * np.where(short, mean / 4, mean * 4) / BIMODAL_SHAPE)
+    return np.maximum(burst, 1).astype(np.int64)
+
+
+def _priorities(rng, n, mix):
+    weights = PRIORITY_MIXES[mix]
+    if weights is None:
+        return rng.integers(PRIORITY_LEVELS[0], PRIORITY_LEVELS[-1] + 1, n)
+    p = np.asarray(weights, dtype=float)
+    return rng.choice(np.asarray(PRIORITY_LEVELS), n, p=p / p.sum())
+
+
+def generate(n, arrival='poisson', burst='exponential', priority='uniform', load=0.9, mean_burst=10, seed=0):
+    if arrival not in ARRIVALS:
+        raise ValueError(f"Unknown arrival process: {arrival}")
+    if burst not in BURSTS:
+        raise ValueError(f"Unknown burst distribution: {burst}")
+    if priority not in PRIORITY_MIXES:
+        raise ValueError(f"Unknown priority mix: {priority}")
+    if not 0 <= n <= MAX_PROCESSES or load <= 0 or mean_burst < 1:
+        raise ValueError(f"Need 0 to {MAX_PROCESSES} processes, a positive load and a mean burst of at least 1")
+    rng = np.random.default_rng(seed)
+    return ProcessTable(
+        np.arange(1, n + 1),
+        _arrivals(rng, n, arrival, mean_burst / load),
+        _bursts(rng, n, burst, mean_burst),
+        _priorities(rng, n, priority),
+    )
+
+
+def write_csv(f, table):
+    f.write('pid,arrival,burst,priority\n')
+    columns = np.column_stack((table.pid, table.arrival, table.burst, table.priority.astype(np.int64)))
+    np.savetxt(f, columns, fmt='%d', delimiter=',')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m workloads', description="Generate a synthetic workload")
+    parser.add_argument('processes', type=int)
+    parser.add_argument('--arrival', choices=ARRIVALS, default='poisson')
+    parser.add_argument('--burst', choices=BURSTS, default='exponential')
+    parser.add_argument('--priority', choices=list(PRIORITY_MIXES), default='uniform')
+    parser.add_argument('--load', type=float, default=0.9, help="offered CPU load (default 0.9)")
+    parser.add_argument('--mean-burst', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True,
+                        help="file to write: .json and .csv by extension, anything else a binary trace")
+    args = parser.parse_args(argv)
+
+    try:
+        table = generate(args.processes, args.arrival, args.burst, args.priority, args.load, args.mean_burst,
+                         args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output.lower().endswith('.json'):
+        with open(args.output, 'w') as f:
+            json.dump(table.to_dicts(), f)
+    elif args.output.lower().endswith('.csv'):
+        with open(args.output, 'w') as f:
+            write_csv(f, table)
+    else:
+        import traces
+        traces.write_trace(args.output, table)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())